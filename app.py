@@ -1,12 +1,28 @@
+import json
+import time
+
 import streamlit as st
-from openai import OpenAI
-from dotenv import load_dotenv
-import os
 
 # Import from my modules
-from prompts import PROMPT_TECHNIQUES
-from utils import validate_inputs, is_valid_input
-from chatbot import start_interview, send_message, end_interview
+from openai_client import chat_completion, get_api_key, warm_up
+from prompts import PROMPT_TECHNIQUES, DIFFICULTIES, PREP_TYPES, JSON_SCHEMAS, build_user_prompt
+from utils import validate_inputs, is_valid_input, rejected_locally, accepted_locally
+from validation_cache import get_validation_cache
+from chatbot import start_interview, send_message, end_interview, resume_interview, older_messages, opening_request
+from transcript import render_transcript
+from streaming import stream_completion, format_timings, latency_log
+from json_stream import PrepParser, finalize, format_question
+from speculative import Prefetch, submit, discard
+from prewarm import PrewarmSlot, config_key
+import job_titles
+import response_cache
+import question_bank
+import metrics
+import scheduler
+import router
+import jd_digest
+import compare
+import semantic_cache
 
 # --- SESSION STATE INITIALIZATION ---
 if "messages" not in st.session_state:
@@ -15,20 +31,55 @@ if "interview_active" not in st.session_state:
     st.session_state.interview_active = False
 if "interview_config" not in st.session_state:
     st.session_state.interview_config = {}
+if "latency_log" not in st.session_state:
+    st.session_state.latency_log = latency_log()
+if "exchanges" not in st.session_state:
+    st.session_state.exchanges = 0
+if "message_offset" not in st.session_state:
+    st.session_state.message_offset = 0
+if "prewarm" not in st.session_state:
+    st.session_state.prewarm = PrewarmSlot()
+if "jd_warmed" not in st.session_state:
+    st.session_state.jd_warmed = set()  # Job descriptions this session has digested in the background
+
+# Speculative requests are registered in session state while validation runs. If a
+# rerun (any widget change) cut the last run short, they were never shown or
+# discarded: stop them now so they don't keep streaming and using rate-limit capacity
+discard(st.session_state.pop("pending_generation", None))
+if st.session_state.pop("unvalidated_interview", False):
+    end_interview()  # Started before its role was validated; also discards the opening
+discard(st.session_state.pop("pending_reply", None))  # An interviewer reply whose stream was cut off
+
+
+def report_validation(role, user_input):
+    """Run the guardrail and show why inputs were rejected; True if generation may go ahead."""
+    try:
+        with st.spinner("🔍 Validating your inputs..."):
+            job_valid, job_reason, input_valid, input_reason = validate_inputs(role, user_input)
+    except Exception as e:
+        st.error(f"Something went wrong: {e}")
+        return False
+    if not job_valid:
+        st.error(f"❌ **Invalid Job Role:** {job_reason}")
+        st.info("💡 Try something like: 'Software Engineer', 'Product Manager', 'Data Scientist', 'Nurse'")
+    if not input_valid:
+        st.error(f"❌ **Invalid Input:** {input_reason}")
+        st.info("💡 Please enter a real job description or leave the field empty.")
+    return job_valid and input_valid
 
-load_dotenv()
-# Try to get API key from environment variable or Streamlit secrets
-try:
-    api_key = st.secrets["OPENAI_API_KEY"]
-except:
-    api_key = os.getenv("OPENAI_API_KEY")
 
-if not api_key:
+# Resume a mock interview after a refresh or restart (its id is kept in the URL)
+if not st.session_state.interview_active and "interview" in st.query_params:
+    if resume_interview(st.query_params["interview"]):
+        st.session_state.prep_type = "Mock Interview"
+    else:
+        del st.query_params["interview"]
+
+# Try to get API key from Streamlit secrets or environment variable
+if not get_api_key():
     st.error("⚠️ OpenAI API key not found. Please add it to Streamlit secrets or .env file.")
     st.stop()
 
-client = OpenAI(api_key=api_key)
-
 # --- PAGE SETUP ---
 st.set_page_config(page_title="Interview Prep AI", page_icon="🎯")
 
@@ -50,19 +101,18 @@ st.markdown("Practice and prepare for your dream job interview!")
 st.sidebar.header("⚙️ Settings")
 
 role = st.sidebar.text_input("Job Role", placeholder="e.g. Software Engineer")
-difficulty = st.sidebar.selectbox("Difficulty Level", ["Easy", "Medium", "Hard"])
-prep_type = st.sidebar.selectbox("What do you want to practice?", [
-    "Technical Questions",
-    "Behavioral Questions (STAR method)",
-    "Questions to ask the Interviewer",
-    "Analyze a Job Description",
-    "Mock Interview"
-])
+if role.strip() and job_titles.lookup(role, fuzzy=False) is None:
+    suggestions = job_titles.suggest(role, limit=3)
+    if suggestions:
+        st.sidebar.caption("💡 Did you mean: " + ", ".join(s.title() for s in suggestions))
+difficulty = st.sidebar.selectbox("Difficulty Level", DIFFICULTIES)
+prep_type = st.sidebar.selectbox("What do you want to practice?", PREP_TYPES + ["Mock Interview"], key="prep_type")
 # Auto-handle technique for Mock Interview
 if prep_type == "Mock Interview":
     # Mock Interview ALWAYS uses Role-Based (best for interviewer persona)
     technique = "Role-Based"
     st.sidebar.info("🎭 **Mock Interview mode:** Using Role-Based technique (interviewer persona)")
+    compare_mode = False
 else:
     # Regular modes - user can choose any technique
     technique = st.sidebar.selectbox(
@@ -72,6 +122,20 @@ else:
     )
     st.sidebar.info(f"**How it works:** {PROMPT_TECHNIQUES[technique]['description']}")
 
+    # Compare mode: the same request with several techniques at once, side by side
+    compare_mode = st.sidebar.toggle(
+        "⚖️ Compare techniques",
+        value=False,
+        help="Validate once, then run the same request with several techniques in parallel and show the answers side by side."
+    )
+    if compare_mode:
+        compare_techniques = st.sidebar.multiselect(
+            "Techniques to compare",
+            options=list(PROMPT_TECHNIQUES.keys()),
+            default=list(PROMPT_TECHNIQUES.keys()),
+            format_func=lambda x: PROMPT_TECHNIQUES[x]["label"]
+        )
+
     
 # === OPENAI MODEL SETTINGS (COLLAPSIBLE) ===
 with st.sidebar.expander("🤖 OpenAI Model Settings", expanded=False):
@@ -88,6 +152,15 @@ with st.sidebar.expander("🤖 OpenAI Model Settings", expanded=False):
         help="gpt-4o-mini is cost-effective and fast. gpt-4o is more capable but pricier."
     )
 
+    # Model routing
+    routing = st.selectbox(
+        "Model routing",
+        options=list(router.POLICY_LABELS.keys()),
+        format_func=lambda x: router.POLICY_LABELS[x],
+        index=list(router.POLICY_LABELS).index(router.DEFAULT_POLICY),
+        help=f"Send a call to {router.SMALL_MODEL} when the selected model would be slower or pricier than the call needs (a note under the answer says when this happened). The selected model is still used for Hard difficulty and to repair a broken JSON answer."
+    )
+
     # Temperature
     temperature = st.slider(
         "Temperature",
@@ -138,6 +211,35 @@ with st.sidebar.expander("🤖 OpenAI Model Settings", expanded=False):
         help="Encourages new topics. Higher values = more likely to talk about new subjects. Range: 0-2"
     )
 
+    # Streaming
+    stream_responses = st.toggle(
+        "Stream responses",
+        value=True,
+        help="Show the answer token by token as it is generated instead of waiting for the full response."
+    )
+
+    # Speculative validation
+    speculative_validation = st.toggle(
+        "Speculative validation",
+        value=True,
+        help="Start generating while your inputs are being validated. The result is only shown if validation passes, so you wait for whichever finishes last instead of both in a row."
+    )
+
+    # Response cache (regular modes only)
+    cache_policy = st.selectbox(
+        "Response cache",
+        options=list(response_cache.POLICY_LABELS.keys()),
+        format_func=lambda x: response_cache.POLICY_LABELS[x],
+        help="Reuse stored answers for identical requests (same role, settings, technique and input). Temperature 0 answers are always reusable; at higher temperatures one of a few stored variants is served."
+    )
+
+    # Question bank (pre-generated with pregenerate.py)
+    use_question_bank = st.toggle(
+        "Use question bank",
+        value=True,
+        help="Serve pre-generated prep instantly when the role, difficulty, prep type, technique, model and sampling settings match and the input box is empty."
+    )
+
     st.caption("💡 **Tip:** Start with defaults, then experiment!")
 
 # --- MAIN INPUT AREA ---
@@ -158,6 +260,34 @@ if prep_type == "Mock Interview":
             help="Providing the real JD makes the mock interview much more realistic and useful!"
         )
         
+        model_settings = {
+            "model": model,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "top_p": top_p,
+            "frequency_penalty": frequency_penalty,
+            "presence_penalty": presence_penalty,
+            "routing": routing,
+            "cache_policy": cache_policy,
+            "job_description": job_description  # ← Pass JD to interview
+        }
+        jd_input = job_description if job_description.strip() else ""
+
+        # Pre-warm: once the settings stop changing, validation and the opening are
+        # requested in the background so Start is instant (see prewarm.py)
+        prewarm_key = config_key(role, difficulty, technique, model_settings)
+        if role and speculative_validation and not rejected_locally(role, jd_input):
+            validate_tags = metrics.tags("validate")
+            opening_tags = metrics.tags("start_interview", technique=technique)
+            digest_tags = metrics.tags("jd_digest")
+            st.session_state.prewarm.update(
+                prewarm_key,
+                lambda: validate_inputs(role, jd_input, tags=validate_tags),
+                lambda: opening_request(role, difficulty, technique, model_settings, opening_tags, digest_tags),
+            )
+        else:
+            st.session_state.prewarm.clear()  # Nothing worth pre-warming for these settings
+
         st.markdown("---")
         
         col1, col2 = st.columns([3, 1])
@@ -171,47 +301,92 @@ if prep_type == "Mock Interview":
                 if not role:
                     st.warning("⚠️ Please enter a Job Role in the sidebar first!")
                 else:
+                    # A pre-warm for exactly these settings already has validation and the
+                    # opening in flight (or done). Otherwise, in speculative mode the opening
+                    # is requested while validation runs; either way it is only shown (and
+                    # kept) if the role passes
+                    warm = st.session_state.prewarm.take(prewarm_key) if speculative_validation else None
+                    opening = None
+                    if warm is not None:
+                        opening = start_interview(role, difficulty, technique, model_settings,
+                                                  warm=(warm.opening, warm.timings))
+                    elif speculative_validation and not rejected_locally(role, jd_input):
+                        opening = start_interview(role, difficulty, technique, model_settings, prefetch=True)
+                    if opening is not None:
+                        # Ended at the top of the next run unless validation finishes in this one
+                        st.session_state.unvalidated_interview = True
+
                     # Validate job role first
-                    with st.spinner("🔍 Validating job role..."):
-                        job_valid, job_reason, _, _ = validate_inputs(role, job_description if job_description.strip() else "")
-                    
-                    if not job_valid:
+                    validation_error = None
+                    try:
+                        with st.spinner("🔍 Validating job role..."):
+                            if warm is not None:
+                                job_valid, job_reason, _, _ = warm.validation.result()
+                            else:
+                                job_valid, job_reason, _, _ = validate_inputs(role, jd_input)
+                    except Exception as e:
+                        validation_error = e
+                    st.session_state.pop("unvalidated_interview", None)
+
+                    if validation_error is not None:
+                        if opening is not None:
+                            end_interview()  # Discards the in-flight opening and the transcript
+                        st.error(f"Something went wrong: {validation_error}")
+                    elif not job_valid:
+                        if opening is not None:
+                            end_interview()  # Discards the in-flight opening
                         st.error(f"❌ **Invalid Job Role:** {job_reason}")
                         st.info("💡 Try something like: 'Software Engineer', 'Product Manager', 'Data Scientist'")
                     else:
-                        # Start the interview with JD context
-                        model_settings = {
-                            "model": model,
-                            "temperature": temperature,
-                            "max_tokens": max_tokens,
-                            "top_p": top_p,
-                            "frequency_penalty": frequency_penalty,
-                            "presence_penalty": presence_penalty,
-                            "job_description": job_description  # ← Pass JD to interview
-                        }
-                        with st.spinner("🎬 Starting your interview..."):
-                            start_interview(role, difficulty, technique, model_settings)
-                        st.rerun()
+                        # Start the interview with JD context. A failed opening (also one
+                        # pre-warmed in the background) ends the interview it started
+                        try:
+                            if opening is None and stream_responses:
+                                opening = start_interview(role, difficulty, technique, model_settings, stream=True)
+
+                            if opening is None:
+                                with st.spinner("🎬 Starting your interview..."):
+                                    start_interview(role, difficulty, technique, model_settings)
+                            elif stream_responses:
+                                with st.chat_message("assistant", avatar="👔"):
+                                    st.write_stream(opening)
+                            else:
+                                with st.spinner("🎬 Starting your interview..."):
+                                    "".join(opening)
+                        except Exception as e:
+                            end_interview()
+                            st.error(f"Something went wrong: {e}")
+                        else:
+                            if st.session_state.transcript_id:
+                                st.query_params["interview"] = st.session_state.transcript_id
+                            st.rerun()
     
     else:
         # Interview is active - show ONLY chat interface (no text area)
         st.markdown("---")
         
-        # Display chat history
-        for message in st.session_state.messages:
-            if message["role"] == "assistant":
-                with st.chat_message("assistant", avatar="👔"):
-                    st.markdown(message["content"])
-            else:
-                with st.chat_message("user", avatar="👤"):
-                    st.markdown(message["content"])
+        # Display chat history (recent window; older turns collapsed and paginated)
+        render_transcript(st.session_state.messages, st.session_state.message_offset, older_messages)
+        last_turn = next((entry for entry in reversed(st.session_state.latency_log)
+                          if entry["call"] in ("start_interview", "send_message")), None)
+        if last_turn is not None:
+            st.caption(format_timings(last_turn))
         
         # Chat input
         user_input_chat = st.chat_input("Type your answer here...")
         
         if user_input_chat:
-            with st.spinner("💭 Interviewer is thinking..."):
-                send_message(user_input_chat)
+            notice = scheduler.queue_notice(st.session_state.interview_config["model"])
+            if notice:
+                st.caption(notice)
+            if stream_responses:
+                with st.chat_message("user", avatar="👤"):
+                    st.markdown(user_input_chat)
+                with st.chat_message("assistant", avatar="👔"):
+                    st.write_stream(send_message(user_input_chat, stream=True))
+            else:
+                with st.spinner("💭 Interviewer is thinking..."):
+                    send_message(user_input_chat)
             st.rerun()
         
         # End interview button
@@ -220,24 +395,36 @@ if prep_type == "Mock Interview":
         with col3:
             if st.button("🛑 End Interview", type="secondary"):
                 end_interview()
+                st.query_params.pop("interview", None)
                 st.rerun()
         with col2:
-            st.caption(f"💬 {len([m for m in st.session_state.messages if m['role'] == 'user'])} exchanges")
+            st.caption(f"💬 {st.session_state.exchanges} exchanges")
 
 else:
     # === REGULAR MODE (all other prep types) ===
+    st.session_state.prewarm.clear()  # Only the mock interview setup screen pre-warms
     user_input = st.text_area(
         "Your input (job description, topic, or just press Generate!)",
         placeholder="Paste a job description here, or describe what you want to practice...",
         height=150
     )
+    # A long job description is condensed once, in the background, but only when requests
+    # may go out before validation anyway and the local pre-screen already passes the inputs
+    if speculative_validation and jd_digest.needs_digest(user_input, prep_type) and accepted_locally(role, user_input):
+        jd_digest.warm(user_input, cache_policy, st.session_state.jd_warmed)
     
-    if st.button("🚀 Generate Interview Prep", type="primary"):
+    generate_clicked = st.button("🚀 Generate Interview Prep", type="primary")
+    regenerate_clicked = False
+    if cache_policy != response_cache.OFF or use_question_bank:
+        regenerate_clicked = st.button("🔄 Regenerate (skip cache)")
+
+    if generate_clicked or regenerate_clicked:
         # Show current settings in an expander
         with st.expander("🔧 Active Settings", expanded=False):
             col1, col2 = st.columns(2)
             with col1:
-                st.metric("Model", model)
+                model_metric = st.empty()  # Updated below if the request is routed to another model
+                model_metric.metric("Model", model)
                 st.metric("Temperature", f"{temperature:.1f}")
                 st.metric("Max Tokens", max_tokens)
             with col2:
@@ -247,69 +434,265 @@ else:
 
         if not role:
             st.warning("⚠️ Please enter a Job Role in the sidebar first!")
+        elif compare_mode:
+            # === COMPARE TECHNIQUES ===
+            passed = report_validation(role, user_input)
+            if not compare_techniques:
+                st.warning("⚠️ Pick at least one technique to compare in the sidebar.")
+            elif passed:
+                compare_tags = {t: metrics.tags("compare", technique=t, prep_type=prep_type) for t in compare_techniques}
+                prompt_input = user_input
+                if jd_digest.needs_digest(user_input, prep_type):
+                    saved = {}
+                    with st.spinner("📄 Condensing the job description..."):
+                        prompt_input = jd_digest.for_prompt(user_input, saved, policy=cache_policy)
+                    for tags in compare_tags.values():
+                        tags.update(saved)  # Every technique's prompt uses the digest
+                user_prompt = build_user_prompt(role, prep_type, difficulty, prompt_input)
+                settings = {
+                    "model": model,
+                    "temperature": temperature,
+                    "max_tokens": max_tokens,
+                    "top_p": top_p,
+                    "frequency_penalty": frequency_penalty,
+                    "presence_penalty": presence_penalty,
+                    "routing": routing
+                }
+
+                # One placeholder per technique, three to a row, filled in as answers arrive
+                slots = {}
+                for start in range(0, len(compare_techniques), 3):
+                    for column, name in zip(st.columns(3), compare_techniques[start:start + 3]):
+                        with column:
+                            st.markdown(f"#### {PROMPT_TECHNIQUES[name]['label']}")
+                            slots[name] = st.empty()
+                            slots[name].caption("⏳ Generating...")
+
+                started = time.perf_counter()
+                sequential = 0.0
+                results = compare.run(compare_techniques, user_prompt, settings, compare_tags,
+                                      cache_policy=cache_policy if not regenerate_clicked else response_cache.OFF,
+                                      difficulty=difficulty)
+                for item in results:
+                    sequential += item["seconds"]
+                    with slots[item["technique"]].container():
+                        if item["error"]:
+                            st.error(f"Something went wrong: {item['error']}")
+                            continue
+                        tokens = item["prompt_tokens"] + item["completion_tokens"]
+                        source = "♻️ cached" if item["cached"] else f"{tokens:,} tokens · {item['model']}"
+                        st.caption(f"⏱️ {item['seconds']:.1f}s · {source}")
+                        if item["json_valid"] is not None:
+                            if item["json_valid"]:
+                                st.caption("✅ Valid JSON")
+                            else:
+                                st.caption("⚠️ Invalid JSON: " + (", ".join(item["problems"]) or "malformed"))
+                        with st.container(height=500):
+                            if item["json_valid"]:
+                                st.json(item["document"])
+                            elif item["json_valid"] is False:
+                                st.code(item["text"], language="json")
+                            else:
+                                st.markdown(item["text"])
+                st.caption(f"⏱️ {len(compare_techniques)} techniques in {time.perf_counter() - started:.1f}s "
+                           f"(one after another they would have taken about {sequential:.1f}s)")
         else:
-            # --- RUN GUARDRAIL VALIDATION FIRST ---
-            with st.spinner("🔍 Validating your inputs..."):
-                job_valid, job_reason, input_valid, input_reason = validate_inputs(role, user_input)
-            
-            # Show errors if validation fails
-            has_error = False
-            
-            if not job_valid:
-                st.error(f"❌ **Invalid Job Role:** {job_reason}")
-                st.info("💡 Try something like: 'Software Engineer', 'Product Manager', 'Data Scientist', 'Nurse'")
-                has_error = True
-                
-            if not input_valid:
-                st.error(f"❌ **Invalid Input:** {input_reason}")
-                st.info("💡 Please enter a real job description or leave the field empty.")
-                has_error = True
-            
+            # Build the request up front so it can be sent speculatively
+            system = PROMPT_TECHNIQUES[technique]["system_prompt"]
+            generate_tags = metrics.tags("generate", technique=technique, prep_type=prep_type)
+            # Speculative mode sends requests (the digest included) while validation runs;
+            # otherwise the guardrail goes first and nothing is sent for invalid inputs
+            speculate = speculative_validation and not rejected_locally(role, user_input)
+            passed = None if speculate else report_validation(role, user_input)
+            prompt_input = user_input
+            if passed is not False and jd_digest.needs_digest(user_input, prep_type):
+                with st.spinner("📄 Condensing the job description..."):
+                    prompt_input = jd_digest.for_prompt(user_input, generate_tags, policy=cache_policy)
+            user_prompt = build_user_prompt(role, prep_type, difficulty, prompt_input)
+
+            is_json = technique in JSON_SCHEMAS
+            parser = None
+            request = dict(
+                model=model,  # ← Use selected model from sidebar
+                messages=[
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens,
+                top_p=top_p,
+                frequency_penalty=frequency_penalty,
+                presence_penalty=presence_penalty
+            )
+            # The selected model is the ceiling; quick or over-budget requests go to the smaller one
+            generate_task = "generate_json" if is_json else "generate"
+            router.route(generate_task, model, request, generate_tags, difficulty=difficulty, policy=routing)
+
+            # Common requests can be served from the question bank or the response
+            # cache instead of the model (still only after validation passes)
+            # Near-duplicate requests: same role, settings and technique, and input
+            # text that only differs in wording (see semantic_cache.py). Blank input
+            # has no wording to vary, so the exact cache covers it.
+            semantic_scope = (semantic_cache.role_key(role), prep_type, difficulty,
+                              dict(request, messages=request["messages"][:1]))
+            cached = None
+            cached_from = None
+            if not regenerate_clicked:
+                if use_question_bank and not user_input.strip():
+                    cached = question_bank.lookup(role, difficulty, prep_type, technique, model, request)
+                    cached_from = "question bank"
+                if cached is None:
+                    cached = response_cache.get(request, cache_policy)
+                    cached_from = "cache"
+                if cached is None and user_input.strip() and response_cache.cacheable(request, cache_policy):
+                    cached = semantic_cache.lookup("generate", semantic_scope, user_input)
+                    cached_from = "a very similar earlier request"
+
+            # Speculative mode: generation starts now, in parallel with validation.
+            # Nothing is displayed until validation passes; otherwise it's discarded.
+            timings = {}
+            pending = None
+            notice = scheduler.queue_notice(request["model"], request) if cached is None else None
+            # Identical requests already in flight are shared when a cached answer would be acceptable anyway
+            coalesce = cache_policy != response_cache.OFF and not regenerate_clicked
+            if speculate and cached is None:
+                if stream_responses:
+                    pending = Prefetch(stream_completion(timings=timings, tags=generate_tags, **request))
+                else:
+                    pending = submit(chat_completion, tags=generate_tags, coalesce=coalesce, **request)
+                st.session_state.pending_generation = pending  # Until consumed (see the top of the script)
+
+            # --- RUN GUARDRAIL VALIDATION (if it didn't run above) ---
+            if passed is None:
+                passed = report_validation(role, user_input)
+            has_error = not passed
+
+            if has_error:
+                discard(st.session_state.pop("pending_generation", None))
+
             # Only proceed if everything is valid
             if not has_error:
-                # Get system prompt from selected technique
-                system = PROMPT_TECHNIQUES[technique]["system_prompt"]
-                user_prompt = f"Job Role: {role}\nPreparation Type: {prep_type}\nDifficulty: {difficulty}"
-                if user_input.strip():
-                    user_prompt += f"\n\nAdditional context:\n{user_input}"
-                
-                with st.spinner("✨ Preparing your interview materials..."):
-                    try:
-                        response = client.chat.completions.create(
-                            model=model,  # ← Use selected model from sidebar
-                            messages=[
-                                {"role": "system", "content": system},
-                                {"role": "user", "content": user_prompt}
-                            ],
-                            temperature=temperature,
-                            max_tokens=max_tokens,
-                            top_p=top_p,
-                            frequency_penalty=frequency_penalty,
-                            presence_penalty=presence_penalty
-                        )
-                        result = response.choices[0].message.content
-                        
-                        # Display results based on technique
-                        if technique in ["JSON Basic", "JSON Detailed"]:
-                            st.success(f"✅ Results using **{PROMPT_TECHNIQUES[technique]['label']}**:")
-                            try:
-                                import json
-                                parsed = json.loads(result)
-                                st.json(parsed)  # Renders JSON nicely in Streamlit
-
-                                # Download button
-                                st.download_button(
-                                    label="📥 Download JSON",
-                                    data=json.dumps(parsed, indent=2),
-                                    file_name=f"interview_prep_{role.replace(' ', '_')}.json",
-                                    mime="application/json"
-                                )
-                            except json.JSONDecodeError:
-                                st.warning("⚠️ Response wasn't valid JSON. Displaying as text:")
-                                st.code(result, language="json")
+                if notice:
+                    st.caption(notice)
+                if cached is None and request["model"] != model:
+                    model_metric.metric("Model", request["model"], delta=f"routed from {model}", delta_color="off")
+                    st.caption(f"🔀 Sent to **{request['model']}** instead of {model} ({generate_tags['route']}). "
+                               "Set Model routing to Off to always use the selected model.")
+                try:
+                    if cached is not None:
+                        result = cached
+                        st.caption(f"♻️ Served from {cached_from} — use **Regenerate** for a fresh answer.")
+                    elif stream_responses:
+                        deltas = pending if pending is not None else stream_completion(
+                            timings=timings, tags=generate_tags, **request)
+                        if is_json:
+                            # Show each question as soon as it is complete, then swap in the full view
+                            parser = PrepParser(technique)
+                            live = st.empty()
+                            questions_box = live.container()
+                            with questions_box:
+                                st.caption("✍️ Writing questions...")
+                            for delta in deltas:
+                                for item in parser.feed(delta):
+                                    with questions_box:
+                                        st.markdown(format_question(len(parser.questions), item))
+                            live.empty()
+                            result = parser.text
                         else:
                             st.success(f"✅ Results using **{PROMPT_TECHNIQUES[technique]['label']}** technique:")
-                            st.markdown(result)
+                            result = st.write_stream(deltas)
+                        st.session_state.latency_log.append({"call": "generate", **timings})
+                    else:
+                        with st.spinner("✨ Preparing your interview materials..."):
+                            if pending is not None:
+                                response = pending.result()
+                            else:
+                                response = chat_completion(tags=generate_tags, coalesce=coalesce, **request)
+                        result = response.choices[0].message.content
+                    st.session_state.pop("pending_generation", None)
 
-                    except Exception as e:
-                        st.error(f"Something went wrong: {e}")
\ No newline at end of file
+                    # JSON answers are validated against the technique's schema; if parts
+                    # are cut off or malformed, only those parts are re-requested
+                    problems = []
+                    if is_json:
+                        if parser is None:
+                            parser = PrepParser(technique)
+                            parser.feed(result)
+                        with st.spinner("🩹 Checking the answer..."):
+                            def complete(repair):
+                                # The first answer came back broken: repair on the selected model
+                                repair_tags = metrics.tags("repair", technique=technique)
+                                router.route(generate_task, model, repair, repair_tags, escalate="json repair",
+                                             policy=routing)
+                                return chat_completion(tags=repair_tags, **repair).choices[0].message.content
+
+                            parsed, problems = finalize(parser, request, complete)
+                        if not problems:
+                            result = json.dumps(parsed, indent=2)
+
+                    if cached is None and not problems:
+                        response_cache.put(request, result, cache_policy)
+                        if user_input.strip() and response_cache.cacheable(request, cache_policy):
+                            semantic_cache.store("generate", semantic_scope, user_input, result)
+
+                    # Display results based on technique
+                    if is_json:
+                        st.success(f"✅ Results using **{PROMPT_TECHNIQUES[technique]['label']}**:")
+                        if parsed["questions"] or len(parsed) > 1:
+                            if problems:
+                                st.warning("⚠️ Part of the response couldn't be recovered: " + ", ".join(problems))
+                            st.json(parsed)  # Renders JSON nicely in Streamlit
+
+                            # Download button
+                            st.download_button(
+                                label="📥 Download JSON",
+                                data=json.dumps(parsed, indent=2),
+                                file_name=f"interview_prep_{role.replace(' ', '_')}.json",
+                                mime="application/json"
+                            )
+                        else:
+                            st.warning("⚠️ Response wasn't valid JSON. Displaying as text:")
+                            st.code(result, language="json")
+                    elif cached is not None or not stream_responses:
+                        st.success(f"✅ Results using **{PROMPT_TECHNIQUES[technique]['label']}** technique:")
+                        st.markdown(result)
+
+                    if timings:
+                        st.caption(format_timings(timings))
+
+                except Exception as e:
+                    st.error(f"Something went wrong: {e}")
+# --- USAGE (rendered last so it includes this run's calls) ---
+with st.sidebar.expander("📊 Session usage", expanded=False):
+    usage = metrics.summarize(st.session_state.get("call_metrics", []))
+    if usage["calls"]:
+        st.markdown(
+            f"**{usage['calls']}** model calls · **{usage['prompt_tokens'] + usage['completion_tokens']:,}** tokens · "
+            f"**${usage['cost_usd']:.4f}** estimated"
+        )
+        st.caption(f"p50 {usage['p50_seconds']:.2f}s · p95 {usage['p95_seconds']:.2f}s · "
+                   f"slowest {usage['max_seconds']:.2f}s · {usage['queued_seconds']:.1f}s queued · "
+                   f"{usage['coalesced']} shared · {usage['errors']} failed")
+        if usage["p50_ttfb_seconds"] is not None:
+            st.caption(f"First byte: p50 {usage['p50_ttfb_seconds']:.2f}s · p95 {usage['p95_ttfb_seconds']:.2f}s")
+        if usage["jd_tokens_saved"]:
+            st.caption(f"📄 {usage['jd_tokens_saved']:,} prompt tokens saved by job description digests")
+        if usage["routed"]:
+            st.caption(f"🔀 {usage['routed']} call(s) routed to a smaller model · ${usage['saved_usd']:.4f} saved")
+        for call, group in usage["by_call"].items():
+            st.caption(f"{call}: {group['calls']} calls, {group['tokens']:,} tokens, {group['seconds']:.1f}s")
+    else:
+        st.caption("No model calls yet in this session.")
+    cache = get_validation_cache().stats()
+    if cache["hits"] + cache["misses"]:
+        st.caption(f"🗄️ Validation cache (this server): {cache['hits']} hits · {cache['misses']} misses · "
+                   f"{cache['entries']} verdicts stored")
+    st.download_button(
+        label="📥 Metrics (Prometheus)",
+        data=metrics.prometheus_text(),
+        file_name="interview_prep_metrics.prom",
+        mime="text/plain"
+    )
+
+# Page is drawn; load the OpenAI SDK in the background before the first call needs it
+warm_up()
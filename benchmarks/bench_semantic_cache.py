@@ -0,0 +1,139 @@
+"""Benchmark the semantic near-duplicate cache.
+
+Fills an index with 100k entries spread over a few hundred scopes, then reports
+lookup latency (single and batched) and the hit rate on reworded repeats of stored
+requests (casing, spacing, punctuation, stock boilerplate), next to the hit rate an
+exact-key cache gets on the same queries. It also reports how often a stored answer
+is wrongly served for an edit that changes the meaning (a number, a responsibility,
+one word) and for an unrelated new input; both must stay at 0.
+
+    python benchmarks/bench_semantic_cache.py [--entries 100000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prompts import PREP_TYPES, PROMPT_TECHNIQUES  # noqa: E402
+from semantic_cache import THRESHOLDS, SemanticIndex, embed, fingerprint, role_key, scope_id  # noqa: E402
+
+ROLES = ["Software Engineer", "Data Scientist", "Product Manager", "Nurse", "Teacher",
+         "DevOps Engineer", "Data Analyst", "UX Designer", "Accountant", "Barista"]
+TECHNIQUES = list(PROMPT_TECHNIQUES)
+
+WORDS = ("design build maintain scalable services data pipelines team product analytics python sql "
+         "cloud aws azure kubernetes customers stakeholders reporting testing mentoring roadmap "
+         "security performance api mobile web dashboards budgets patients lessons coffee").split()
+BOILERPLATE = [
+    "We are an equal opportunity employer.",
+    "Apply today!",
+    "Benefits include health insurance and a flexible schedule.",
+]
+COMPANY = ("Acme is a fast-growing company with offices in Austin and London. We value ownership, curiosity "
+           "and collaboration, and our mission is to make payments simple for small businesses. ")
+
+
+def random_input(rng):
+    """A job description: shared company text, then a few random sentences about the role."""
+    sentences = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 15))).capitalize() + "."
+                 for _ in range(rng.randint(1, 4))]
+    return COMPANY * rng.randint(0, 3) + " ".join(sentences)
+
+
+def reword(text, rng):
+    """A repeat of `text` as users actually resend it: same content, different form."""
+    change = rng.randrange(4)
+    if change == 0:
+        return text.upper()
+    if change == 1:
+        return "  " + text.replace(" ", "  ") + "\n"
+    if change == 2:
+        return text + " " + rng.choice(BOILERPLATE)
+    return text.replace(".", " .").replace(",", "")
+
+
+def change_meaning(text, rng):
+    """`text` with an edit that asks for different prep; must never be served the stored answer."""
+    change = rng.randrange(3)
+    if change == 0:
+        return text + f" At least {rng.randint(2, 15)} years of experience."
+    if change == 1:
+        return text + " " + rng.choice(WORDS).capitalize() + " " + " ".join(rng.sample(WORDS, 8)) + "."
+    words = text.split()
+    slot = rng.randrange(len(words))
+    words[slot] = rng.choice([w for w in WORDS if w != words[slot].lower().strip(".,")])  # One word changed
+    return " ".join(words)
+
+
+def fill(index, entries, rng):
+    """Write `entries` rows directly (going through add() would search on every insert)."""
+    scopes = [scope_id("generate", (role_key(role), prep, tech))
+              for role in ROLES for prep in PREP_TYPES for tech in TECHNIQUES]
+    stored = []
+    for slot in range(entries):
+        scope, text = rng.choice(scopes), random_input(rng)
+        index.vectors[slot] = embed(text)
+        index.scopes[slot] = scope
+        stored.append((scope, text))
+    index._conn.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?)",
+                            [(slot, scope, json.dumps(f"answer {slot}"), time.time(), fingerprint(text))
+                             for slot, (scope, text) in enumerate(stored)])
+    index.flush()
+    return scopes, stored
+
+
+def main(entries=100_000, queries=500, batch=64, seed=7):
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as path:
+        index = SemanticIndex(path, capacity=entries)
+        started = time.perf_counter()
+        scopes, stored = fill(index, entries, rng)
+        fill_s = time.perf_counter() - started
+
+        # Queries: reworded repeats of stored entries
+        asked = [(scope, text, reword(text, rng)) for scope, text in rng.sample(stored, queries)]
+
+        def get(scope, text):
+            return index.get(scope, embed(text), THRESHOLDS["generate"], fingerprint(text))
+
+        latencies = []
+        hits = exact = 0
+        for scope, original, query in asked:
+            started = time.perf_counter()
+            found = get(scope, query)
+            latencies.append((time.perf_counter() - started) * 1e3)
+            hits += found is not None
+            exact += query == original
+
+        # Edits that change the meaning, and unrelated new inputs, in the same scopes must miss
+        changed_hits = sum(get(scope, change_meaning(original, rng)) is not None for scope, original, _ in asked)
+        false_hits = sum(get(scope, random_input(rng)) is not None for scope, _, _ in asked)
+
+        vectors = np.stack([embed(query) for _, _, query in asked[:batch]])
+        started = time.perf_counter()
+        index.search(asked[0][0], vectors)
+        batch_ms = (time.perf_counter() - started) * 1e3
+
+        latencies.sort()
+        print(f"index fill:            {entries} entries, {len(scopes)} scopes in {fill_s:.1f} s")
+        print(f"single lookup:         p50 {latencies[len(latencies) // 2]:.2f} ms, "
+              f"p99 {latencies[int(len(latencies) * 0.99)]:.2f} ms")
+        print(f"batched search:        {batch} queries in {batch_ms:.2f} ms ({batch_ms / batch:.3f} ms each)")
+        print(f"hit rate (reworded):   semantic {hits / queries:.0%}, exact key {exact / queries:.0%}")
+        print(f"false hits (changed):  {changed_hits / queries:.1%}")
+        print(f"false hits (new text): {false_hits / queries:.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+    main(args.entries, args.queries)
@@ -0,0 +1,119 @@
+"""Benchmark cold start and per-rerun script time of the Streamlit app.
+
+Cold start: imports every module app.py imports in a fresh interpreter under
+`python -X importtime` and reports the total, the slowest imports and whether
+the OpenAI SDK (or httpx) was loaded before the first render.
+
+Reruns: drives app.py with Streamlit's AppTest (no model calls are made) and
+reports the first script run and the mean of the following reruns.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 5 --reruns 20 --output startup.json
+"""
+import argparse
+import ast
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+NETWORK_MODULES = ("openai", "httpx", "dotenv")
+
+
+def app_imports():
+    """Top-level modules imported by app.py, in order."""
+    with open(os.path.join(ROOT, "app.py"), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def import_profile(modules):
+    """(total_us, {module: cumulative_us}) for importing `modules` in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modules)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    cumulative = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        _, cum_us, indent, name = match.groups()
+        cumulative[name] = int(cum_us)
+        if not indent:  # Top-level imports add up to the whole import time
+            total += int(cum_us)
+    return total, cumulative
+
+
+def time_reruns(reruns):
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    from streamlit.testing.v1 import AppTest
+
+    def run_once():
+        # A fresh AppTest per run: this AppTest version can't replay selectboxes
+        # that use format_func. Modules stay imported, as on a real rerun.
+        at = AppTest.from_file("app.py", default_timeout=60)
+        at.secrets["OPENAI_API_KEY"] = "bench"
+        started = time.perf_counter()
+        at.run()
+        elapsed = time.perf_counter() - started
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+        return elapsed
+
+    first = run_once()
+    return first, [run_once() for _ in range(reruns)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="Cold import runs (best is reported)")
+    parser.add_argument("--reruns", type=int, default=10, help="Script reruns to time")
+    parser.add_argument("--output", help="Also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    modules = app_imports()
+    profiles = [import_profile(modules) for _ in range(args.repeat)]
+    total, cumulative = min(profiles, key=lambda p: p[0])
+    app_only = [m for m in modules if m != "streamlit"]
+    streamlit_total, _ = min((import_profile(["streamlit"]) for _ in range(args.repeat)), key=lambda p: p[0])
+    loaded_network = [m for m in NETWORK_MODULES if m in cumulative]
+
+    first, reruns = time_reruns(args.reruns)
+
+    print(f"Cold import of app.py's modules: {total / 1e3:.1f} ms "
+          f"(streamlit alone {streamlit_total / 1e3:.1f} ms, app modules on top {(total - streamlit_total) / 1e3:.1f} ms)")
+    for name in app_only:
+        if name in cumulative:
+            print(f"  {name:<18} {cumulative[name] / 1e3:8.1f} ms")
+    print("  network libraries imported at startup: " + (", ".join(loaded_network) or "none"))
+    print(f"Script run: first {first * 1e3:.1f} ms, rerun mean {statistics.mean(reruns) * 1e3:.1f} ms "
+          f"(min {min(reruns) * 1e3:.1f} ms over {len(reruns)})")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "import_total_ms": round(total / 1e3, 2),
+                "streamlit_import_ms": round(streamlit_total / 1e3, 2),
+                "modules_ms": {m: round(cumulative[m] / 1e3, 2) for m in app_only if m in cumulative},
+                "network_libraries_at_startup": loaded_network,
+                "first_run_ms": round(first * 1e3, 2),
+                "rerun_mean_ms": round(statistics.mean(reruns) * 1e3, 2),
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""Load test and latency benchmark against the local mock OpenAI server.
+
+Simulates many concurrent users, each running a full session through the real
+code paths: utils.validate_inputs, a one-shot generate request built exactly like
+the generate branch in app.py, and a multi-turn mock interview through
+chatbot.start_interview / chatbot.send_message. Writes a JSON report so runs can
+be compared across commits:
+
+    python benchmarks/load_test.py --sessions 50 --concurrency 10 --turns 12
+    python benchmarks/load_test.py --latency 0.3 --token-rate 80 --error-rate 0.02 --output results.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+import types
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mock_openai_server import start_server  # noqa: E402
+
+ROLES = ["Barista Trainer", "Quantum Field Technician", "Growth Hacker", "Prompt Engineer"]
+ANSWER = ("In my last role I led a migration of our reporting pipeline. I broke the work into "
+          "milestones, aligned stakeholders weekly and we shipped two weeks early. ")
+
+
+class ThreadSessionState:
+    """st.session_state stand-in: one independent state per simulated user (thread)."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _state(self):
+        if not hasattr(self._local, "state"):
+            self._local.state = {}
+        return self._local.state
+
+    def reset(self):
+        self._local.state = {}
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self._state()[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        if name.startswith("_"):
+            object.__setattr__(self, name, value)
+        else:
+            self._state()[name] = value
+
+    def __contains__(self, name):
+        return name in self._state()
+
+    def get(self, name, default=None):
+        return self._state().get(name, default)
+
+    def pop(self, name, *default):
+        return self._state().pop(name, *default)
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def deep_size(obj, seen=None):
+    """Approximate memory held by plain Python data (dicts, lists, strings)."""
+    seen = seen if seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(deep_size(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += deep_size(vars(obj), seen)
+    return size
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=30, help="Simulated users (default: 30)")
+    parser.add_argument("--concurrency", type=int, default=10, help="Users active at once (default: 10)")
+    parser.add_argument("--turns", type=int, default=10, help="Interview answers per user (default: 10)")
+    parser.add_argument("--stream", action="store_true", help="Use the streaming code paths")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock time to first byte (s)")
+    parser.add_argument("--token-rate", type=float, default=0.0, help="Mock completion tokens/s (0 = instant)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of mock requests failing with 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share failing with 429")
+    parser.add_argument("--rpm", type=int, default=1_000_000, help="Scheduler requests/min per model (default: unthrottled)")
+    parser.add_argument("--tpm", type=int, default=1_000_000_000, help="Scheduler tokens/min per model")
+    parser.add_argument("--output", default="load_test_results.json", help="JSON report path")
+    args = parser.parse_args(argv)
+
+    server, base_url = start_server(
+        latency=args.latency, token_rate=args.token_rate,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+    )
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ["OPENAI_API_KEY"] = "load-test"
+    os.environ["OPENAI_RPM"] = str(args.rpm)
+    os.environ["OPENAI_TPM"] = str(args.tpm)
+
+    # Imported after the environment points at the mock server
+    import chatbot
+    from openai_client import chat_completion
+    from prompts import PROMPT_TECHNIQUES, build_user_prompt
+    from streaming import stream_completion
+    from utils import validate_inputs
+
+    session_state = ThreadSessionState()
+    chatbot.st = types.SimpleNamespace(session_state=session_state)
+
+    # Record the prompt size of every interview turn (real calls, just observed)
+    prompt_tokens = defaultdict(list)
+    current_turn = threading.local()
+    original_completion = chatbot.chat_completion
+    original_stream = chatbot.stream_completion
+
+    def note_prompt(messages):
+        turn = getattr(current_turn, "value", None)
+        if turn is not None:
+            prompt_tokens[turn].append(sum(len(m["content"]) // 4 + 4 for m in messages))
+
+    def observed_completion(**kwargs):
+        if kwargs.get("max_tokens") != chatbot.SUMMARY_MAX_TOKENS:
+            note_prompt(kwargs["messages"])
+        return original_completion(**kwargs)
+
+    def observed_stream(timings=None, **kwargs):
+        note_prompt(kwargs["messages"])
+        return original_stream(timings=timings, **kwargs)
+
+    chatbot.chat_completion = observed_completion
+    chatbot.stream_completion = observed_stream
+
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    session_bytes = []
+    lock = threading.Lock()
+
+    def timed(name, fn, *fn_args, **fn_kwargs):
+        started = time.perf_counter()
+        try:
+            result = fn(*fn_args, **fn_kwargs)
+            if args.stream and hasattr(result, "__next__"):
+                result = "".join(result)
+        except Exception:
+            with lock:
+                errors[name] += 1
+            raise
+        with lock:
+            latencies[name].append(time.perf_counter() - started)
+        return result
+
+    def generate(role):
+        request = dict(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": PROMPT_TECHNIQUES["Chain-of-Thought"]["system_prompt"]},
+                {"role": "user", "content": build_user_prompt(role, "Technical Questions", "Medium")},
+            ],
+            temperature=0.7, max_tokens=1000,
+        )
+        if args.stream:
+            return "".join(stream_completion(**request))
+        return chat_completion(**request).choices[0].message.content
+
+    def run_session(index):
+        session_state.reset()
+        role = ROLES[index % len(ROLES)]
+        settings = {"model": "gpt-4o-mini", "temperature": 0.7, "max_tokens": 1000, "top_p": 1.0,
+                    "frequency_penalty": 0.0, "presence_penalty": 0.0, "job_description": ""}
+        try:
+            # Unknown roles + no cache so every session really reaches the model
+            timed("validate_inputs", validate_inputs, role, "", use_cache=False)
+            timed("generate", generate, role)
+            current_turn.value = 0
+            timed("start_interview", chatbot.start_interview, role, "Medium", "Role-Based",
+                  settings, stream=args.stream)
+            for turn in range(1, args.turns + 1):
+                current_turn.value = turn
+                timed("send_message", chatbot.send_message, f"{ANSWER} (answer {turn})", stream=args.stream)
+        except Exception:
+            pass  # Counted in `errors`; the session simply stops like a user giving up
+        finally:
+            current_turn.value = None
+            state = {k: v for k, v in session_state._state().items()}
+            with lock:
+                session_bytes.append(deep_size(state))
+
+    # One warm-up call builds the shared client and the SDK's lazy response models,
+    # so the first wave of sessions doesn't pay one-off startup costs
+    chat_completion(model="gpt-4o-mini", messages=[{"role": "user", "content": "warm up"}], max_tokens=1)
+    "".join(stream_completion(model="gpt-4o-mini", messages=[{"role": "user", "content": "warm up"}], max_tokens=1))
+    tracemalloc.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(run_session, range(args.sessions)))
+    wall = time.perf_counter() - started
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    server.shutdown()
+
+    total_calls = sum(len(v) for v in latencies.values())
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "config": vars(args),
+        "wall_seconds": round(wall, 3),
+        "requests_per_second": round(total_calls / wall, 2) if wall else None,
+        "operations": {
+            name: {
+                "count": len(values),
+                "errors": errors.get(name, 0),
+                "p50_ms": round(percentile(values, 50) * 1e3, 2),
+                "p95_ms": round(percentile(values, 95) * 1e3, 2),
+                "p99_ms": round(percentile(values, 99) * 1e3, 2),
+                "mean_ms": round(statistics.mean(values) * 1e3, 2),
+            }
+            for name, values in latencies.items() if values
+        },
+        "prompt_tokens_by_turn": {
+            str(turn): round(statistics.mean(values)) for turn, values in sorted(prompt_tokens.items())
+        },
+        "memory": {
+            "session_state_bytes_mean": round(statistics.mean(session_bytes)) if session_bytes else None,
+            "traced_peak_bytes": peak_memory,
+            "traced_peak_bytes_per_session": round(peak_memory / max(1, args.concurrency)),
+        },
+    }
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"{args.sessions} sessions x {args.turns} turns, concurrency {args.concurrency}, "
+          f"{total_calls} calls in {wall:.2f}s ({report['requests_per_second']} req/s)")
+    for name, stats in report["operations"].items():
+        print(f"  {name:<16} n={stats['count']:<5} err={stats['errors']:<3} "
+              f"p50={stats['p50_ms']:>8.1f}ms p95={stats['p95_ms']:>8.1f}ms p99={stats['p99_ms']:>8.1f}ms")
+    turns = report["prompt_tokens_by_turn"]
+    print("  prompt tokens by turn: " + ", ".join(f"{t}:{n}" for t, n in turns.items()))
+    print(f"  session state ~{report['memory']['session_state_bytes_mean']} bytes/session; "
+          f"report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,121 @@
+import time
+
 import streamlit as st
-from openai import OpenAI
-from dotenv import load_dotenv
-from prompts import PROMPT_TECHNIQUES
-import os
+import metrics
+import router
+import jd_digest
+import response_cache
+from openai_client import chat_completion
+from prompts import PROMPT_TECHNIQUES, render
+from streaming import latency_log, stream_completion
+from history import HistoryManager, SUMMARY_MAX_TOKENS
+from speculative import Prefetch, discard
+from transcript_store import get_store
 
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
+def _record_timings(call, timings):
+    """Keep per-call time-to-first-token so the UI can show each interview turn's latency."""
+    if "latency_log" not in st.session_state:
+        st.session_state.latency_log = latency_log()
+    st.session_state.latency_log.append({"call": call, **timings})
 
-def start_interview(role, difficulty, technique, model_settings):
-    """Initialize a new mock interview session."""
-    st.session_state.interview_active = True
-    st.session_state.messages = []
-    # Extract job description if provided
-    job_description = model_settings.pop("job_description", "")
-    
-    st.session_state.interview_config = {
+
+def _complete_reply(call, request, tags):
+    """Non-streaming reply; its wall time is logged like a streamed turn (no first-token time)."""
+    started = time.perf_counter()
+    response = chat_completion(tags=tags, **request)
+    _record_timings(call, {"ttft": None, "total": time.perf_counter() - started})
+    return response.choices[0].message.content
+
+
+def _stream_reply(call, request, tags, prefetch=False):
+    """Start streaming the interviewer's reply and return a generator of deltas.
+
+    With prefetch=True the request is sent right away on a background thread
+    (see speculative.Prefetch) and kept in st.session_state.pending_reply until
+    it is consumed or end_interview() discards it.
+    """
+    timings = {}
+    source = stream_completion(timings=timings, tags=tags, **request)
+    if prefetch:
+        source = Prefetch(source)
+        st.session_state.pending_reply = source
+    return _collect_reply(call, source, timings)
+
+
+def _request(call, api_messages, config, tags=None):
+    """Request kwargs and metric tags for an interviewer reply, routed to a model (see router.py)."""
+    request = dict(
+        messages=api_messages,
+        temperature=config["temperature"],
+        max_tokens=config["max_tokens"],
+        top_p=config["top_p"],
+        frequency_penalty=config["frequency_penalty"],
+        presence_penalty=config["presence_penalty"]
+    )
+    if tags is None:
+        tags = metrics.tags(call, technique=config["technique"])
+    router.route(call, config["model"], request, tags, difficulty=config["difficulty"],
+                 policy=config.get("routing", router.DEFAULT_POLICY))
+    return request, tags
+
+
+def _collect_reply(call, source, timings):
+    """Yield deltas from source, then save the full message once the stream ends."""
+    chunks = []
+    for delta in source:
+        chunks.append(delta)
+        yield delta
+
+    st.session_state.pop("pending_reply", None)
+    _append({"role": "assistant", "content": "".join(chunks)})
+    _record_timings(call, timings)
+
+
+def _append(message):
+    """Add a message to the interview, writing it through to the transcript store."""
+    st.session_state.messages.append(message)
+    if st.session_state.get("transcript_id"):
+        get_store().append(st.session_state.transcript_id, message)
+
+
+def _release_summarized():
+    """Drop turns now covered by the rolling summary from memory (they stay in the store)."""
+    history = st.session_state.history
+    if not st.session_state.get("transcript_id") or not history.summarized_upto:
+        return
+    del st.session_state.messages[:history.summarized_upto]
+    st.session_state.message_offset += history.summarized_upto
+    history.summarized_upto = 0
+    get_store().save_summary(st.session_state.transcript_id, history.summary, st.session_state.message_offset)
+
+
+def older_messages(start, end):
+    """Messages [start, end) of the interview, counting ones already released from memory."""
+    offset = st.session_state.get("message_offset", 0)
+    loaded = []
+    if start < offset and st.session_state.get("transcript_id"):
+        loaded = get_store().messages(st.session_state.transcript_id, start, min(end, offset))
+    return loaded + st.session_state.messages[max(0, start - offset):max(0, end - offset)]
+
+
+def _summarizer(model, policy=router.DEFAULT_POLICY):
+    """Callable used by HistoryManager to fold old turns into the rolling summary."""
+    def summarize(prompt):
+        request = dict(
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.3,
+            max_tokens=SUMMARY_MAX_TOKENS
+        )
+        tags = metrics.tags("summary")
+        router.route("summary", model, request, tags, policy=policy)
+        response = chat_completion(tags=tags, **request)
+        return response.choices[0].message.content
+    return summarize
+
+
+def _interview_config(role, difficulty, technique, model_settings):
+    return {
         "role": role,
         "difficulty": difficulty,
         "technique": technique,
@@ -24,71 +124,132 @@ def start_interview(role, difficulty, technique, model_settings):
         "max_tokens": model_settings["max_tokens"],
         "top_p": model_settings["top_p"],
         "frequency_penalty": model_settings["frequency_penalty"],
-        "presence_penalty": model_settings["presence_penalty"]
+        "presence_penalty": model_settings["presence_penalty"],
+        "routing": model_settings.get("routing", router.DEFAULT_POLICY)
     }
-    
+
+
+def opening_request(role, difficulty, technique, model_settings, tags=None, digest_tags=None):
+    """Request kwargs and metric tags for the interviewer's opening.
+
+    Touches no session state, so it can be built off the script thread (see
+    prewarm.py) when given tags made on it. A long job description is replaced by
+    its digest (see jd_digest.py).
+    """
+    config = _interview_config(role, difficulty, technique, model_settings)
+    if tags is None:
+        tags = metrics.tags("start_interview", technique=technique)
+    job_description = jd_digest.for_prompt(model_settings.get("job_description", ""), tags, digest_tags,
+                                           model_settings.get("cache_policy", response_cache.DETERMINISTIC))
+
     # Get system prompt based on technique
     system_prompt = PROMPT_TECHNIQUES[technique]["system_prompt"]
-    
-    # Create initial interviewer message
-    initial_prompt = f"""You are conducting a mock interview for a {role} position at {difficulty} difficulty level.
-    if job_description.strip():
-    initial_prompt += f"JOB DESCRIPTION:\n{job_description}\n\n"
 
-   initial_prompt += Start by:
-1. Briefly introducing yourself as the interviewer
-2. Asking your first interview question
+    # Opening request: static instructions first, then role/difficulty/JD
+    initial_prompt = render("interview_opening", role=role, difficulty=difficulty,
+                            job_description=job_description)
 
-Keep it conversational and professional."""
+    api_messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": initial_prompt}
+    ]
+    return _request("start_interview", api_messages, config, tags)
+
+
+def start_interview(role, difficulty, technique, model_settings, stream=False, prefetch=False, warm=None):
+    """Initialize a new mock interview session.
+
+    With stream=True this returns a generator of text deltas for the opening
+    message; the message is added to the history once the generator is exhausted.
+    prefetch=True (implies stream) fires the request immediately so it can run
+    while the inputs are still being validated; call end_interview() to discard it.
+    `warm` is an opening already requested for these exact settings, as
+    (Prefetch, timings); it is used like prefetch=True without a new request.
+    """
+    st.session_state.interview_active = True
+    st.session_state.messages = []
+    st.session_state.exchanges = 0
     
+    st.session_state.interview_config = config = _interview_config(role, difficulty, technique, model_settings)
+    st.session_state.history = HistoryManager(_summarizer(config["model"], config["routing"]))
+    store = get_store()
+    st.session_state.transcript_id = store.create(st.session_state.interview_config) if store else None
+    st.session_state.message_offset = 0
+
+    if warm is not None:
+        source, timings = warm
+        st.session_state.pending_reply = source
+        return _collect_reply("start_interview", source, timings)
+
+    request, tags = opening_request(role, difficulty, technique, model_settings)
+    if stream or prefetch:
+        return _stream_reply("start_interview", request, tags, prefetch=prefetch)
+
     # Get interviewer's opening
-    response = client.chat.completions.create(
-        model=model_settings["model"],
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": initial_prompt}
-        ],
-        temperature=model_settings["temperature"],
-        max_tokens=model_settings["max_tokens"],
-        top_p=model_settings["top_p"],
-        frequency_penalty=model_settings["frequency_penalty"],
-        presence_penalty=model_settings["presence_penalty"]
-    )
-    
-    opening = response.choices[0].message.content
-    st.session_state.messages.append({"role": "assistant", "content": opening})
+    opening = _complete_reply("start_interview", request, tags)
+    _append({"role": "assistant", "content": opening})
 
 
-def send_message(user_message):
-    """Send a message in the interview and get response."""
+def send_message(user_message, stream=False):
+    """Send a message in the interview and get response.
+
+    With stream=True this returns a generator of text deltas for the reply.
+    """
     config = st.session_state.interview_config
     
     # Add user message to history
-    st.session_state.messages.append({"role": "user", "content": user_message})
+    _append({"role": "user", "content": user_message})
+    st.session_state.exchanges = st.session_state.exchanges + 1 if "exchanges" in st.session_state else 1
     
-    # Build conversation for API (include system prompt + all messages)
+    # Build conversation for API: system prompt + rolling summary + recent turns
     system_prompt = PROMPT_TECHNIQUES[config["technique"]]["system_prompt"]
-    
-    api_messages = [{"role": "system", "content": system_prompt}]
-    api_messages.extend(st.session_state.messages)
-    
+
+    if "history" not in st.session_state:
+        st.session_state.history = HistoryManager(
+            _summarizer(config["model"], config.get("routing", router.DEFAULT_POLICY)))
+    api_messages = st.session_state.history.build(system_prompt, st.session_state.messages)
+    _release_summarized()
+
+    request, tags = _request("send_message", api_messages, config)
+    if stream:
+        return _stream_reply("send_message", request, tags)
+
     # Get interviewer response
-    response = client.chat.completions.create(
-        model=config["model"],
-        messages=api_messages,
-        temperature=config["temperature"],
-        max_tokens=config["max_tokens"],
-        top_p=config["top_p"],
-        frequency_penalty=config["frequency_penalty"],
-        presence_penalty=config["presence_penalty"]
-    )
-    
-    assistant_message = response.choices[0].message.content
-    st.session_state.messages.append({"role": "assistant", "content": assistant_message})
+    assistant_message = _complete_reply("send_message", request, tags)
+    _append({"role": "assistant", "content": assistant_message})
+
+
+def resume_interview(transcript_id):
+    """Restore an interview from the transcript store; False if it can't be resumed.
+
+    Only the rolling summary and the turns after it are loaded into memory.
+    """
+    store = get_store()
+    state = store.load(transcript_id) if store else None
+    if state is None:
+        return False
+    config = state["config"]
+    st.session_state.interview_active = True
+    st.session_state.interview_config = config
+    st.session_state.messages = state["messages"]
+    st.session_state.message_offset = state["offset"]
+    st.session_state.exchanges = state["exchanges"]
+    st.session_state.transcript_id = transcript_id
+    st.session_state.history = HistoryManager(
+        _summarizer(config["model"], config.get("routing", router.DEFAULT_POLICY)))
+    st.session_state.history.summary = state["summary"]
+    return True
 
 
 def end_interview():
     """End the mock interview session."""
+    discard(st.session_state.pop("pending_reply", None))
+    if st.session_state.get("transcript_id"):
+        get_store().end(st.session_state.transcript_id)
+    st.session_state.transcript_id = None
+    st.session_state.message_offset = 0
     st.session_state.interview_active = False
     st.session_state.messages = []
-    st.session_state.interview_config = {}
\ No newline at end of file
+    st.session_state.exchanges = 0
+    st.session_state.interview_config = {}
+    st.session_state.pop("history", None)
\ No newline at end of file
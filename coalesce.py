@@ -0,0 +1,54 @@
+import os
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+# Single-flight coalescing: when identical requests are in flight at the same time
+# (e.g. several users validating "Software Engineer" at once), only the first one
+# calls the API and everyone else gets its result, or its exception. Only used
+# where sharing an answer is fine; see openai_client.chat_completion.
+
+MAX_WAIT = float(os.getenv("COALESCE_MAX_WAIT", 30))  # Followers stop waiting and call on their own after this
+
+
+class SingleFlight:
+    """At most one call per key at a time; concurrent callers with that key share its outcome."""
+
+    def __init__(self, max_wait=MAX_WAIT):
+        self.max_wait = max_wait
+        self.shared = 0  # Calls answered from another caller's request
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def call(self, key, fn):
+        """Return (result, shared) where shared is True if another caller's request answered it."""
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            try:
+                result = future.result(timeout=self.max_wait)  # Re-raises the leader's exception
+            except FutureTimeout:
+                return fn(), False
+            with self._lock:
+                self.shared += 1
+            return result, True
+
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._inflight)
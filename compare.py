@@ -0,0 +1,84 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import response_cache
+import router
+from json_stream import PrepParser
+from openai_client import chat_completion
+from prompts import JSON_SCHEMAS, PROMPT_TECHNIQUES
+
+# "Compare techniques" mode: the same generate request is sent with several
+# techniques' system prompts at once, so a comparison takes about as long as the
+# slowest technique rather than the sum of all of them. Results come back in the
+# order they finish. Nothing here touches st.*: the calls run on a worker pool.
+
+MAX_WORKERS = int(os.getenv("COMPARE_MAX_WORKERS", 12))  # Shared by every session in the process
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="compare")
+
+
+def technique_request(technique, user_prompt, settings):
+    """chat.completions kwargs for one technique; `settings` holds the sampling params."""
+    return dict(
+        model=settings["model"],
+        messages=[
+            {"role": "system", "content": PROMPT_TECHNIQUES[technique]["system_prompt"]},
+            {"role": "user", "content": user_prompt}
+        ],
+        temperature=settings["temperature"],
+        max_tokens=settings["max_tokens"],
+        top_p=settings["top_p"],
+        frequency_penalty=settings["frequency_penalty"],
+        presence_penalty=settings["presence_penalty"]
+    )
+
+
+def _run(technique, request, tags, cache_policy):
+    result = {"technique": technique, "model": request["model"], "cached": False, "error": None,
+              "prompt_tokens": 0, "completion_tokens": 0, "json_valid": None, "problems": []}
+    started = time.perf_counter()
+    try:
+        text = response_cache.get(request, cache_policy)
+        if text is not None:
+            result["cached"] = True
+        else:
+            response = chat_completion(tags=tags, coalesce=cache_policy != response_cache.OFF, **request)
+            text = response.choices[0].message.content
+            usage = getattr(response, "usage", None)
+            result["prompt_tokens"] = getattr(usage, "prompt_tokens", 0) or 0
+            result["completion_tokens"] = getattr(usage, "completion_tokens", 0) or 0
+    except Exception as error:
+        result["error"] = str(error)
+        result["seconds"] = time.perf_counter() - started
+        return result
+    result["seconds"] = time.perf_counter() - started
+    result["text"] = text
+
+    # JSON techniques are checked against their schema (no repair: this is a comparison)
+    if technique in JSON_SCHEMAS:
+        parser = PrepParser(technique)
+        parser.feed(text)
+        result["problems"] = parser.problems()
+        result["json_valid"] = parser.closed and not parser.problems() and not parser.rejected
+        result["document"] = parser.document()
+    if not result["cached"] and not result["problems"]:
+        response_cache.put(request, text, cache_policy)
+    return result
+
+
+def run(techniques, user_prompt, settings, tags, cache_policy=response_cache.OFF, difficulty=None):
+    """Send the request with each technique concurrently; yields result dicts as they finish.
+
+    `tags` maps technique -> metric tags (made on the script thread). Each request
+    is routed like a normal generation (see router.py).
+    """
+    futures = []
+    for technique in techniques:
+        request = technique_request(technique, user_prompt, settings)
+        task = "generate_json" if technique in JSON_SCHEMAS else "generate"
+        router.route(task, settings["model"], request, tags[technique], difficulty=difficulty,
+                     policy=settings.get("routing", router.DEFAULT_POLICY))
+        futures.append(_executor.submit(_run, technique, request, tags[technique], cache_policy))
+    for future in as_completed(futures):
+        yield future.result()
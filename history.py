@@ -0,0 +1,92 @@
+DEFAULT_TOKEN_BUDGET = 3000   # Max prompt tokens for system + summary + recent turns
+DEFAULT_KEEP_EXCHANGES = 4    # Most recent question/answer pairs sent verbatim
+SUMMARY_STRIDE = 2            # Fold older turns in batches of this many exchanges
+SUMMARY_MAX_TOKENS = 300
+
+SUMMARY_PROMPT = """You maintain running notes for a mock job interview so the interviewer can stay consistent.
+Update the notes with the new turns below. Keep: questions already asked, the candidate's key claims,
+strengths and weaknesses observed, and any promises the interviewer made. Be concise (under 200 words).
+
+CURRENT NOTES:
+{summary}
+
+NEW TURNS:
+{turns}
+
+Reply with the updated notes only."""
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token for English text)."""
+    return len(text) // 4 + 1
+
+
+def message_tokens(message):
+    # Every chat message carries a few tokens of role/formatting overhead
+    return estimate_tokens(message["content"]) + 4
+
+
+class HistoryManager:
+    """Builds a bounded prompt for each interview turn.
+
+    The system prompt and the last `keep_exchanges` exchanges are sent verbatim.
+    Everything older is folded into a rolling summary. The summary is updated
+    incrementally (old notes + newly dropped turns) and only when the verbatim
+    window slides forward, so most turns cost no extra model call.
+    """
+
+    def __init__(self, summarize, token_budget=DEFAULT_TOKEN_BUDGET,
+                 keep_exchanges=DEFAULT_KEEP_EXCHANGES, stride=SUMMARY_STRIDE):
+        self.summarize = summarize  # callable(prompt) -> str
+        self.token_budget = token_budget
+        self.keep_exchanges = keep_exchanges
+        self.stride = stride
+        self.summary = ""
+        self.summarized_upto = 0  # messages[:summarized_upto] are covered by the summary
+        self.refreshes = 0
+
+    def build(self, system_prompt, messages):
+        """Return the api_messages list for the next model call."""
+        cut = self._window_start(len(messages))
+        self._fold(messages, cut)
+
+        # Shrink the verbatim window further if a turn is unusually long
+        while self._prompt_tokens(system_prompt, messages[self.summarized_upto:]) > self.token_budget:
+            if len(messages) - self.summarized_upto <= 1:
+                break
+            self._fold(messages, self.summarized_upto + 2)
+
+        api_messages = [{"role": "system", "content": system_prompt}]
+        if self.summary:
+            api_messages.append({
+                "role": "system",
+                "content": f"Notes on the interview so far (earlier turns omitted):\n{self.summary}"
+            })
+        api_messages.extend(messages[self.summarized_upto:])
+        return api_messages
+
+    def _window_start(self, count):
+        # Only slide in steps of `stride` exchanges so the summary isn't rewritten every turn
+        keep = 2 * self.keep_exchanges + 1
+        overflow = count - keep
+        if overflow <= 0:
+            return self.summarized_upto
+        step = 2 * self.stride
+        return max(self.summarized_upto, overflow - overflow % step)
+
+    def _fold(self, messages, cut):
+        cut = min(cut, len(messages) - 1)
+        if cut <= self.summarized_upto:
+            return
+        turns = "\n".join(
+            f"{'Interviewer' if m['role'] == 'assistant' else 'Candidate'}: {m['content']}"
+            for m in messages[self.summarized_upto:cut]
+        )
+        prompt = SUMMARY_PROMPT.format(summary=self.summary or "(none yet)", turns=turns)
+        self.summary = self.summarize(prompt).strip()
+        self.summarized_upto = cut
+        self.refreshes += 1
+
+    def _prompt_tokens(self, system_prompt, recent):
+        total = estimate_tokens(system_prompt) + estimate_tokens(self.summary)
+        return total + sum(message_tokens(m) for m in recent)
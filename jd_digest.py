@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import metrics
+import response_cache
+import router
+from history import estimate_tokens
+from openai_client import chat_completion
+from prompts import render
+from speculative import submit
+
+# Long job descriptions are condensed once into a short structured digest
+# (seniority, responsibilities, required skills, tech stack), which prompts then use
+# instead of the raw text. Digests are kept by content hash in memory whatever the
+# response cache policy, so changing technique, difficulty or prep type reuses the
+# same digest. When the policy allows it they are also stored on disk through the
+# response cache (a temperature-0 request keyed on the JD and prompt).
+
+ENABLED = os.getenv("JD_DIGEST_ENABLED", "1") != "0"
+MIN_CHARS = int(os.getenv("JD_DIGEST_MIN_CHARS", 1200))  # Shorter inputs are used as they are
+MAX_WARM_PER_SESSION = int(os.getenv("JD_DIGEST_MAX_WARM_PER_SESSION", 3))
+RAW_PREP_TYPES = {"Analyze a Job Description"}  # The user asked about the JD itself
+MAX_TOKENS = 400
+MEMORY_ENTRIES = 256
+WARM_WAIT_SECONDS = 30  # How long a prompt waits for a digest already in flight
+
+SECTIONS = [
+    ("responsibilities", "Responsibilities"),
+    ("required_skills", "Required skills"),
+    ("tech_stack", "Tech stack"),
+]
+
+_memory = OrderedDict()  # content hash -> digest text
+_warming = {}  # content hash -> Event set when the background digest is done
+_lock = threading.Lock()
+
+
+def content_hash(text):
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+def needs_digest(text, prep_type=None):
+    return ENABLED and prep_type not in RAW_PREP_TYPES and len((text or "").strip()) >= MIN_CHARS
+
+
+def _request(text):
+    return dict(
+        model=router.SMALL_MODEL,
+        messages=[{"role": "user", "content": render("jd_digest", job_description=text.strip())}],
+        temperature=0,
+        max_tokens=MAX_TOKENS,
+        response_format={"type": "json_object"},
+    )
+
+
+def format_digest(parsed):
+    """Compact prompt text for a parsed digest; empty if it holds nothing usable."""
+    lines = []
+    if isinstance(parsed.get("seniority"), str) and parsed["seniority"].strip():
+        lines.append(f"Seniority: {parsed['seniority'].strip()}")
+    for key, label in SECTIONS:
+        items = parsed.get(key)
+        if isinstance(items, list):
+            items = [str(item).strip() for item in items if str(item).strip()]
+            if items:
+                lines.append(f"{label}: {'; '.join(items)}")
+    if not lines:
+        return ""
+    return "Digest of the job description:\n" + "\n".join(lines)
+
+
+def cached(text, policy=response_cache.DETERMINISTIC):
+    """The stored digest for `text`, without calling the model; None if there isn't one."""
+    key = content_hash(text)
+    with _lock:
+        if key in _memory:
+            _memory.move_to_end(key)
+            return _memory[key]
+    digest = response_cache.get(_request(text), policy)
+    if digest is not None:
+        _remember(key, digest)
+    return digest
+
+
+def _remember(key, digest):
+    with _lock:
+        _memory[key] = digest
+        _memory.move_to_end(key)
+        while len(_memory) > MEMORY_ENTRIES:
+            _memory.popitem(last=False)
+
+
+def digest(text, tags=None, policy=response_cache.DETERMINISTIC):
+    """Digest of a long job description; the text itself if it can't be condensed."""
+    found = cached(text, policy)
+    if found is not None:
+        return found
+    with _lock:
+        pending = _warming.get(content_hash(text))
+    if pending is not None and pending.wait(WARM_WAIT_SECONDS):  # Reuse the background digest
+        found = cached(text, policy)
+        if found is not None:
+            return found
+    return _generate(text, tags, policy)
+
+
+def _generate(text, tags, policy):
+    request = _request(text)
+    try:
+        response = chat_completion(tags=tags if tags is not None else metrics.tags("jd_digest"), **request)
+        result = format_digest(json.loads(response.choices[0].message.content))
+    except Exception:
+        return text  # Never block a request on the digest
+    if not result or estimate_tokens(result) >= estimate_tokens(text):
+        result = text
+    _remember(content_hash(text), result)
+    response_cache.put(request, result, policy)  # Disk only when the policy caches
+    return result
+
+
+def for_prompt(text, tags=None, digest_tags=None, policy=response_cache.DETERMINISTIC):
+    """What to put in a prompt for `text`: its digest when long, else the text.
+
+    The prompt tokens saved are added to `tags` (see metrics.record).
+    """
+    if not needs_digest(text):
+        return text
+    result = digest(text, digest_tags, policy)
+    if tags is not None:
+        tags["jd_tokens_saved"] = max(0, estimate_tokens(text) - estimate_tokens(result))
+    return result
+
+
+def warm(text, policy=response_cache.DETERMINISTIC, warmed=None):
+    """Start digesting `text` in the background, so it is ready when a prompt needs it.
+
+    Only call this for text that passed validation (or the local pre-screen).
+    `warmed` is the session's set of texts already warmed; at most
+    MAX_WARM_PER_SESSION are started per session.
+    """
+    if not needs_digest(text):
+        return
+    key = content_hash(text)
+    if warmed is not None:
+        if key not in warmed and len(warmed) >= MAX_WARM_PER_SESSION:
+            return
+        warmed.add(key)
+    with _lock:
+        if key in _memory or key in _warming:
+            return
+        _warming[key] = done = threading.Event()
+    tags = metrics.tags("jd_digest")  # Made here: the worker has no Streamlit session
+
+    def run():
+        try:
+            _generate(text, tags, policy)
+        finally:
+            with _lock:
+                _warming.pop(key, None)
+            done.set()
+
+    submit(run)
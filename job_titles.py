@@ -0,0 +1,227 @@
+import bisect
+import os
+import re
+import threading
+from collections import defaultdict
+
+# Bundled index of real occupation titles used to accept known job roles locally.
+# Titles are normalized (lowercase, no seniority/level, singular), stored as a sorted
+# array for prefix search and a trigram index for typo-tolerant lookup.
+
+TITLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "job_titles.txt")
+
+# Whole-title abbreviations
+ABBREVIATIONS = {
+    "swe": "software engineer",
+    "sde": "software engineer",
+    "se": "software engineer",
+    "pm": "product manager",
+    "tpm": "technical program manager",
+    "em": "engineering manager",
+    "ds": "data scientist",
+    "de": "data engineer",
+    "da": "data analyst",
+    "ba": "business analyst",
+    "bi analyst": "business intelligence analyst",
+    "ml engineer": "machine learning engineer",
+    "mle": "machine learning engineer",
+    "sre": "site reliability engineer",
+    "qa": "qa engineer",
+    "sdet": "software engineer in test",
+    "dba": "database administrator",
+    "rn": "registered nurse",
+    "np": "nurse practitioner",
+    "pa": "physician assistant",
+    "emt": "emergency medical technician",
+    "cna": "nursing assistant",
+    "pt": "physical therapist",
+    "ot": "occupational therapist",
+    "ceo": "chief executive officer",
+    "cfo": "chief financial officer",
+    "cto": "chief technology officer",
+    "coo": "chief operating officer",
+    "cmo": "chief marketing officer",
+    "cio": "chief information officer",
+    "cpa": "accountant",
+    "hrbp": "hr business partner",
+    "ux": "ux designer",
+    "ui": "ui designer",
+    "ui/ux designer": "ux designer",
+    "ux/ui designer": "ux designer",
+    "csm": "customer success manager",
+    "ae": "account executive",
+    "sdr": "sales representative",
+    "bdr": "sales representative",
+}
+
+# Word-level expansions applied before lookup
+WORD_ALIASES = {
+    "sr": "senior", "jr": "junior", "mgr": "manager", "eng": "engineer",
+    "engr": "engineer", "dev": "developer", "devs": "developer", "admin": "administrator",
+    "asst": "assistant", "assoc": "associate", "rep": "representative", "exec": "executive",
+    "fullstack": "full stack",
+}
+# Leading words that describe seniority rather than the job itself
+SENIORITY_WORDS = {
+    "junior", "senior", "lead", "principal", "staff", "associate", "entry", "level",
+    "mid", "intern", "trainee", "graduate", "head", "distinguished", "apprentice", "experienced",
+}
+# Short keys are only ever matched exactly: one typo turns "faker" into "baker"
+MIN_FUZZY_LENGTH = 6
+LEVEL_SUFFIXES = {"i", "ii", "iii", "iv", "v", "1", "2", "3", "4", "5"}
+
+_TOKEN_RE = re.compile(r"[a-z0-9/+#]+")
+
+
+def _singular(word):
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith(("xes", "ches", "shes")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def normalize(title):
+    """Normalize a title: lowercase, expand aliases, drop seniority/levels, singularize."""
+    text = (title or "").lower().replace("front-end", "frontend").replace("back-end", "backend")
+    text = text.replace("full-stack", "full stack").replace("&", " and ")
+    words = []
+    for token in _TOKEN_RE.findall(text):
+        words.extend(WORD_ALIASES.get(token, token).split())
+
+    joined = " ".join(words)
+    if joined in ABBREVIATIONS:
+        return ABBREVIATIONS[joined]
+
+    # "head of engineering" / "director of X" keep their "of"; only strip leading seniority
+    while len(words) > 1 and words[0] in SENIORITY_WORDS and words[1] != "of":
+        words = words[1:]
+    while len(words) > 1 and words[-1] in LEVEL_SUFFIXES:
+        words = words[:-1]
+    if words:
+        words[-1] = _singular(words[-1])
+
+    joined = " ".join(words)
+    return ABBREVIATIONS.get(joined, joined)
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _edit_distance(a, b, limit):
+    """Damerau-Levenshtein distance, giving up early once it exceeds `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class JobTitleIndex:
+    """Sorted array of canonical titles plus a trigram index for fuzzy lookup."""
+
+    def __init__(self, titles):
+        self.titles = sorted({normalize(t) for t in titles if t.strip()})
+        self._known = frozenset(self.titles)
+        self._grams = defaultdict(list)
+        self._gram_counts = []
+        for position, title in enumerate(self.titles):
+            grams = _trigrams(title)
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self._grams[gram].append(position)
+
+    @classmethod
+    def from_file(cls, path=TITLES_PATH):
+        with open(path, encoding="utf-8") as f:
+            return cls(line.strip() for line in f if line.strip() and not line.startswith("#"))
+
+    def lookup(self, role, fuzzy=True):
+        """Return the canonical title for a role (allowing small typos unless fuzzy=False), or None."""
+        key = normalize(role)
+        if not key:
+            return None
+        if key in self._known:
+            return key
+        if not fuzzy or len(key) <= MIN_FUZZY_LENGTH:
+            return None
+        match = self._closest(key)
+        return match[0] if match else None
+
+    def suggest(self, text, limit=5):
+        """Titles starting with `text`, falling back to the closest fuzzy matches."""
+        key = " ".join(_TOKEN_RE.findall((text or "").lower()))
+        if not key:
+            return []
+        start = bisect.bisect_left(self.titles, key)
+        results = []
+        for title in self.titles[start:]:
+            if not title.startswith(key) or len(results) >= limit:
+                break
+            results.append(title)
+        if len(results) < limit:
+            for title, _ in self._closest(normalize(text), many=limit):
+                if title not in results:
+                    results.append(title)
+        return results[:limit]
+
+    def _closest(self, key, many=None):
+        # Candidates share at least 40% of their trigrams with the key
+        grams = _trigrams(key)
+        counts = defaultdict(int)
+        for gram in grams:
+            for position in self._grams.get(gram, ()):
+                counts[position] += 1
+        limit = max(1, len(key) // 6)  # ~1 typo per 6 characters
+        if many is not None:
+            limit += 2  # Suggestions can be looser than acceptance
+        scored = []
+        for position, shared in counts.items():
+            if shared / max(len(grams), self._gram_counts[position]) < 0.4:
+                continue
+            title = self.titles[position]
+            distance = _edit_distance(key, title, limit)
+            if distance <= limit:
+                scored.append((distance, title))
+        scored.sort()
+        if many is None:
+            return scored[0][::-1] if scored else None
+        return [(title, distance) for distance, title in scored[:many]]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Load and build the bundled index on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = JobTitleIndex.from_file()
+    return _index
+
+
+def lookup(role, fuzzy=True):
+    """Canonical title for a known job role, or None if it isn't in the index."""
+    return get_index().lookup(role, fuzzy)
+
+
+def suggest(text, limit=5):
+    """Autocomplete suggestions for a partially typed role."""
+    return get_index().suggest(text, limit)
@@ -0,0 +1,206 @@
+import json
+
+from prompts import JSON_SCHEMAS, render
+
+# Incremental parser for the JSON techniques. Fed the completion as it streams, it
+# hands back each element of "questions" as soon as its closing brace arrives, so
+# questions can render one by one. Completed top-level values are kept too; if the
+# answer ends up cut off or partly malformed, only the missing parts are re-requested.
+
+
+def _matches(value, example):
+    if isinstance(example, bool) or isinstance(value, bool):
+        return isinstance(value, bool) == isinstance(example, bool)
+    if isinstance(example, (int, float)):
+        return isinstance(value, (int, float))
+    if isinstance(example, str):
+        return isinstance(value, str) and bool(value.strip())
+    return isinstance(value, type(example))
+
+
+class PrepParser:
+    """Streaming parser for one JSON technique answer, validated against its schema.
+
+    The schema is the example JSON in the technique's system prompt: every key of the
+    example is required, with a value of the same type.
+    """
+
+    def __init__(self, technique):
+        self.technique = technique
+        self.schema = JSON_SCHEMAS[technique]
+        self.item_schema = self.schema["questions"][0]
+        self.min_questions = len(self.schema["questions"])
+        self.text = ""
+        self.fields = {}      # Completed top-level values, except questions
+        self.questions = []   # Complete, valid questions in order
+        self.rejected = 0     # Complete questions that were malformed or invalid
+        self.closed = False   # Root object finished
+
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_string = None  # Most recent string at the top level (a key, before ':')
+        self._key = None
+        self._value_start = None
+        self._in_questions = False
+        self._item_start = None
+
+    def feed(self, delta):
+        """Add streamed text; returns the questions completed by it."""
+        self.text += delta
+        text = self.text
+        completed = []
+        pos = self._pos
+        while pos < len(text) and not self.closed:
+            ch = text[pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_string = text[self._string_start:pos + 1]
+            elif ch == '"':
+                self._in_string = True
+                self._string_start = pos
+            elif ch in "{[":
+                if ch == "{" and self._in_questions and self._depth == 2:
+                    self._item_start = pos
+                elif ch == "[" and self._depth == 1 and self._key == "questions":
+                    self._in_questions = True
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if ch == "}" and self._depth == 2 and self._item_start is not None:
+                    item = self._add_question(text[self._item_start:pos + 1])
+                    self._item_start = None
+                    if item is not None:
+                        completed.append(item)
+                elif self._depth == 1 and ch == "]":
+                    self._in_questions = False
+                elif self._depth == 0:
+                    self._end_value(text, pos)
+                    self.closed = True
+            elif self._depth == 1:
+                if ch == ":" and self._last_string is not None:
+                    try:
+                        self._key = json.loads(self._last_string)
+                    except ValueError:
+                        self._key = None
+                    self._value_start = pos + 1
+                elif ch == ",":
+                    self._end_value(text, pos)
+            pos += 1
+        self._pos = pos
+        return completed
+
+    def _add_question(self, raw):
+        try:
+            item = json.loads(raw)
+        except ValueError:
+            self.rejected += 1
+            return None
+        if not isinstance(item, dict) or not all(
+            key in item and _matches(item[key], example) for key, example in self.item_schema.items()
+        ):
+            self.rejected += 1
+            return None
+        self.questions.append(item)
+        return item
+
+    def _end_value(self, text, pos):
+        if self._key is not None and self._key != "questions" and self._value_start is not None:
+            try:
+                self.fields[self._key] = json.loads(text[self._value_start:pos])
+            except ValueError:
+                pass  # Broken value; it counts as missing
+        self._key = None
+        self._value_start = None
+
+    def missing_fields(self):
+        return [
+            key for key, example in self.schema.items()
+            if key != "questions" and not (key in self.fields and _matches(self.fields[key], example))
+        ]
+
+    def missing_questions(self):
+        return max(0, self.min_questions - len(self.questions))
+
+    def problems(self):
+        problems = [f"missing {key}" for key in self.missing_fields()]
+        if self.missing_questions():
+            problems.append(f"{self.missing_questions()} question(s) missing")
+        return problems
+
+    def document(self):
+        """Everything recovered so far, in the schema's key order."""
+        document = {}
+        for key in self.schema:
+            if key == "questions":
+                document["questions"] = self.questions
+            elif key in self.fields:
+                document[key] = self.fields[key]
+        for key, value in self.fields.items():
+            document.setdefault(key, value)
+        if "id" in self.item_schema:
+            for number, item in enumerate(self.questions, start=1):
+                item["id"] = number
+        return document
+
+    def repair_request(self, request):
+        """A follow-up request for only the missing parts, or None if nothing is missing."""
+        missing = self.missing_fields()
+        count = self.missing_questions()
+        if not missing and not count:
+            return None
+        shape = {key: self.schema[key] for key in missing}
+        if count:
+            shape["questions"] = [self.item_schema]
+        prompt = render(
+            "json_repair",
+            shape=json.dumps(shape, indent=2),
+            count=count,
+            asked="\n".join(f"- {item['question']}" for item in self.questions) or "(none yet)",
+        )
+        # The answer so far goes back as the assistant turn, so the model sees what it wrote
+        previous = [{"role": "assistant", "content": self.text}] if self.text.strip() else []
+        repair = dict(request, messages=request["messages"] + previous + [{"role": "user", "content": prompt}])
+        repair.pop("stream", None)
+        return repair
+
+    def merge(self, text):
+        """Fill the missing parts from the answer to repair_request()."""
+        missing = self.missing_fields()
+        count = self.missing_questions()
+        patch = PrepParser(self.technique)
+        patch.feed(text)
+        for key in missing:
+            if key in patch.fields:
+                self.fields[key] = patch.fields[key]
+        self.questions.extend(patch.questions[:count])
+
+
+def finalize(parser, request, complete):
+    """Validated document for a finished answer, re-requesting only what's missing (once).
+
+    `complete(request)` runs a model call and returns its text. Returns
+    (document, problems); problems lists whatever still couldn't be recovered.
+    """
+    repair = parser.repair_request(request)
+    if repair is not None:
+        try:
+            parser.merge(complete(repair))
+        except Exception:
+            pass  # Keep what was salvaged; problems() reports the rest
+    return parser.document(), parser.problems()
+
+
+def format_question(number, item):
+    """Markdown for one question while the rest of the answer is still streaming."""
+    detail = item.get("hint") or item.get("what_is_tested") or ""
+    text = f"**Q{number}. {item['question']}**"
+    return f"{text}  \n_{detail}_" if detail else text
@@ -0,0 +1,249 @@
+import bisect
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+# Per-call latency, token and cost instrumentation for every model call.
+# openai_client.chat_completion / streaming.stream_completion call record();
+# records feed process-wide histograms (Prometheus text / JSON lines export)
+# and, when made from a Streamlit session, that session's own call log.
+
+ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+JSONL_PATH = os.getenv("METRICS_JSONL")  # Append one JSON line per call when set
+
+LATENCY_BUCKETS = [0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 32, 64]
+SESSION_LOG_LIMIT = 500  # Calls kept per session for the sidebar panel
+
+# USD per 1M tokens (input, output); unknown models are counted with zero cost
+PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+
+_lock = threading.Lock()
+_histograms = defaultdict(lambda: [0] * (len(LATENCY_BUCKETS) + 1))  # (call, model) -> counts
+_sums = defaultdict(float)     # (call, model) -> total seconds
+_ttfb_histograms = defaultdict(lambda: [0] * (len(LATENCY_BUCKETS) + 1))  # (call, model) -> counts
+_ttfb_sums = defaultdict(float)  # (call, model) -> total seconds to first byte
+_requests = defaultdict(int)   # (call, model, outcome) -> count
+_tokens = defaultdict(int)     # (call, model, kind) -> tokens
+_cost = defaultdict(float)     # (call, model) -> USD
+_queued = defaultdict(float)   # (call, model) -> seconds spent waiting in the scheduler
+_coalesced = defaultdict(int)  # (call, model) -> calls answered by another caller's identical request
+_routed = defaultdict(int)     # (call, requested model, model, reason) -> calls (see router.py)
+_saved_usd = defaultdict(float)      # call -> spend saved by routing to a cheaper model
+_saved_seconds = defaultdict(float)  # call -> estimated seconds saved by routing
+_jd_saved = defaultdict(int)   # call -> prompt tokens saved by job description digests (see jd_digest.py)
+
+
+def cost_usd(model, prompt_tokens, completion_tokens):
+    price_in, price_out = PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * price_in + completion_tokens * price_out) / 1_000_000
+
+
+def tags(call, **fields):
+    """Labels for a model call, plus the current Streamlit session and its call log.
+
+    Must be called from the script thread (not inside a background worker) so the
+    session can be found; the returned dict can then travel to any thread.
+    """
+    labels = {"call": call, **fields}
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        import streamlit as st
+    except ImportError:
+        return labels
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return labels
+    if "call_metrics" not in st.session_state:
+        st.session_state.call_metrics = []
+    labels["session"] = ctx.session_id
+    labels["sink"] = st.session_state.call_metrics
+    return labels
+
+
+def record(labels, model, outcome, wall, ttfb=None, prompt_tokens=0, completion_tokens=0):
+    """Record one finished model call."""
+    if not ENABLED:
+        return
+    labels = dict(labels or {})
+    sink = labels.pop("sink", None)
+    call = labels.get("call", "other")
+    prompt_tokens = prompt_tokens or 0
+    completion_tokens = completion_tokens or 0
+    cost = cost_usd(model, prompt_tokens, completion_tokens)
+    requested = labels.get("requested_model") or model
+    saved = cost_usd(requested, prompt_tokens, completion_tokens) - cost if requested != model else 0.0
+
+    entry = {
+        "ts": time.time(), "model": model, "outcome": outcome,
+        "wall": round(wall, 4), "ttfb": round(ttfb, 4) if ttfb is not None else None,
+        "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+        "cost_usd": round(cost, 6), "saved_usd": round(saved, 6), **labels,
+    }
+
+    with _lock:
+        key = (call, model)
+        _histograms[key][bisect.bisect_left(LATENCY_BUCKETS, wall)] += 1
+        _sums[key] += wall
+        if ttfb is not None:
+            _ttfb_histograms[key][bisect.bisect_left(LATENCY_BUCKETS, ttfb)] += 1
+            _ttfb_sums[key] += ttfb
+        _requests[(call, model, outcome)] += 1
+        _tokens[(call, model, "prompt")] += prompt_tokens
+        _tokens[(call, model, "completion")] += completion_tokens
+        _cost[key] += cost
+        _queued[key] += labels.get("queued") or 0.0
+        _coalesced[key] += bool(labels.get("coalesced"))
+        if "route" in labels:
+            _routed[(call, requested, model, labels["route"])] += 1
+            _saved_usd[call] += saved
+            _saved_seconds[call] += labels.get("est_saved_seconds") or 0.0
+        _jd_saved[call] += labels.get("jd_tokens_saved") or 0
+        if JSONL_PATH:
+            with open(JSONL_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    if sink is not None:
+        sink.append(entry)
+        if len(sink) > SESSION_LOG_LIMIT:
+            del sink[:len(sink) - SESSION_LOG_LIMIT]
+
+
+def outcome_of(error):
+    return "ok" if error is None else f"error:{type(error).__name__}"
+
+
+def prometheus_text():
+    """All process-wide metrics in the Prometheus text exposition format."""
+    lines = [
+        "# HELP interview_llm_request_seconds Wall time of model calls.",
+        "# TYPE interview_llm_request_seconds histogram",
+    ]
+    with _lock:
+        for (call, model), counts in sorted(_histograms.items()):
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ["+Inf"], counts):
+                cumulative += count
+                lines.append(
+                    f'interview_llm_request_seconds_bucket{{call="{call}",model="{model}",le="{bound}"}} {cumulative}'
+                )
+            lines.append(f'interview_llm_request_seconds_sum{{call="{call}",model="{model}"}} {_sums[(call, model)]:.6f}')
+            lines.append(f'interview_llm_request_seconds_count{{call="{call}",model="{model}"}} {cumulative}')
+
+        lines += ["# HELP interview_llm_time_to_first_byte_seconds Time until the first streamed token or the response.",
+                  "# TYPE interview_llm_time_to_first_byte_seconds histogram"]
+        for (call, model), counts in sorted(_ttfb_histograms.items()):
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ["+Inf"], counts):
+                cumulative += count
+                lines.append(f'interview_llm_time_to_first_byte_seconds_bucket{{call="{call}",model="{model}",'
+                             f'le="{bound}"}} {cumulative}')
+            lines.append(f'interview_llm_time_to_first_byte_seconds_sum{{call="{call}",model="{model}"}} '
+                         f'{_ttfb_sums[(call, model)]:.6f}')
+            lines.append(f'interview_llm_time_to_first_byte_seconds_count{{call="{call}",model="{model}"}} {cumulative}')
+
+        lines += ["# HELP interview_llm_requests_total Model calls by outcome.",
+                  "# TYPE interview_llm_requests_total counter"]
+        for (call, model, outcome), count in sorted(_requests.items()):
+            lines.append(f'interview_llm_requests_total{{call="{call}",model="{model}",outcome="{outcome}"}} {count}')
+
+        lines += ["# HELP interview_llm_tokens_total Tokens used by model calls.",
+                  "# TYPE interview_llm_tokens_total counter"]
+        for (call, model, kind), count in sorted(_tokens.items()):
+            lines.append(f'interview_llm_tokens_total{{call="{call}",model="{model}",kind="{kind}"}} {count}')
+
+        lines += ["# HELP interview_llm_cost_usd_total Estimated spend in USD.",
+                  "# TYPE interview_llm_cost_usd_total counter"]
+        for (call, model), cost in sorted(_cost.items()):
+            lines.append(f'interview_llm_cost_usd_total{{call="{call}",model="{model}"}} {cost:.6f}')
+
+        lines += ["# HELP interview_llm_queue_seconds_total Time calls spent waiting for rate-limit capacity.",
+                  "# TYPE interview_llm_queue_seconds_total counter"]
+        for (call, model), seconds in sorted(_queued.items()):
+            lines.append(f'interview_llm_queue_seconds_total{{call="{call}",model="{model}"}} {seconds:.6f}')
+
+        lines += ["# HELP interview_llm_coalesced_total Calls that shared an identical in-flight request.",
+                  "# TYPE interview_llm_coalesced_total counter"]
+        for (call, model), count in sorted(_coalesced.items()):
+            lines.append(f'interview_llm_coalesced_total{{call="{call}",model="{model}"}} {count}')
+
+        lines += ["# HELP interview_llm_routed_total Model routing decisions.",
+                  "# TYPE interview_llm_routed_total counter"]
+        for (call, requested, model, reason), count in sorted(_routed.items()):
+            lines.append(f'interview_llm_routed_total{{call="{call}",requested="{requested}",model="{model}",'
+                         f'reason="{reason}"}} {count}')
+
+        lines += ["# HELP interview_llm_routing_saved_usd_total Spend saved by routing to a cheaper model.",
+                  "# TYPE interview_llm_routing_saved_usd_total counter"]
+        for call, saved in sorted(_saved_usd.items()):
+            lines.append(f'interview_llm_routing_saved_usd_total{{call="{call}"}} {saved:.6f}')
+
+        lines += ["# HELP interview_llm_routing_saved_seconds_total Estimated time saved by routing.",
+                  "# TYPE interview_llm_routing_saved_seconds_total counter"]
+        for call, seconds in sorted(_saved_seconds.items()):
+            lines.append(f'interview_llm_routing_saved_seconds_total{{call="{call}"}} {seconds:.3f}')
+
+        lines += ["# HELP interview_llm_jd_digest_tokens_saved_total Prompt tokens saved by job description digests.",
+                  "# TYPE interview_llm_jd_digest_tokens_saved_total counter"]
+        for call, tokens in sorted(_jd_saved.items()):
+            lines.append(f'interview_llm_jd_digest_tokens_saved_total{{call="{call}"}} {tokens}')
+
+    from validation_cache import get_validation_cache
+    cache = get_validation_cache().stats()
+    lines += ["# HELP interview_validation_cache_lookups_total Validation cache lookups by result (all processes).",
+              "# TYPE interview_validation_cache_lookups_total counter",
+              f'interview_validation_cache_lookups_total{{result="hit"}} {cache["total_hits"]}',
+              f'interview_validation_cache_lookups_total{{result="miss"}} {cache["total_misses"]}',
+              "# HELP interview_validation_cache_entries Verdicts currently stored.",
+              "# TYPE interview_validation_cache_entries gauge",
+              f'interview_validation_cache_entries {cache["entries"]}']
+
+    import scheduler
+    lines += ["# HELP interview_llm_queue_depth Calls currently waiting in the scheduler.",
+              "# TYPE interview_llm_queue_depth gauge"]
+    for model, depth in sorted(scheduler.depths().items()):
+        lines.append(f'interview_llm_queue_depth{{model="{model}"}} {depth}')
+    return "\n".join(lines) + "\n"
+
+
+def summarize(entries):
+    """Totals and per-call breakdown for a list of recorded calls (a session log)."""
+    summary = {"calls": len(entries), "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0,
+               "errors": 0, "queued_seconds": 0.0, "coalesced": 0, "routed": 0, "saved_usd": 0.0, "jd_tokens_saved": 0, "by_call": {}}
+    walls = []
+    for entry in entries:
+        summary["prompt_tokens"] += entry["prompt_tokens"]
+        summary["completion_tokens"] += entry["completion_tokens"]
+        summary["cost_usd"] += entry["cost_usd"]
+        summary["errors"] += entry["outcome"] != "ok"
+        summary["queued_seconds"] += entry.get("queued") or 0.0
+        summary["coalesced"] += bool(entry.get("coalesced"))
+        summary["routed"] += entry.get("requested_model", entry["model"]) != entry["model"]
+        summary["saved_usd"] += entry.get("saved_usd", 0.0)
+        summary["jd_tokens_saved"] += entry.get("jd_tokens_saved") or 0
+        walls.append(entry["wall"])
+        group = summary["by_call"].setdefault(entry.get("call", "other"), {"calls": 0, "seconds": 0.0, "tokens": 0})
+        group["calls"] += 1
+        group["seconds"] += entry["wall"]
+        group["tokens"] += entry["prompt_tokens"] + entry["completion_tokens"]
+    ttfbs = sorted(entry["ttfb"] for entry in entries if entry.get("ttfb") is not None)
+    walls.sort()
+    summary["p50_seconds"] = _percentile(walls, 0.5)
+    summary["p95_seconds"] = _percentile(walls, 0.95)
+    summary["max_seconds"] = walls[-1] if walls else None
+    summary["p50_ttfb_seconds"] = _percentile(ttfbs, 0.5)
+    summary["p95_ttfb_seconds"] = _percentile(ttfbs, 0.95)
+    return summary
+
+
+def _percentile(ordered, fraction):
+    """Nearest-rank percentile of a sorted list, or None if it is empty."""
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
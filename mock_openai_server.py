@@ -0,0 +1,169 @@
+"""Local stand-in for the OpenAI chat completions API.
+
+Serves canned but well-formed answers (validator verdicts, valid JSON for the JSON
+techniques, plain markdown otherwise), with or without streaming, so the batch
+pipeline and benchmarks can run offline. Latency, token rate and injected errors
+are configurable to mimic the real API under load:
+
+    python mock_openai_server.py --port 8000 --latency 0.3 --token-rate 80 --error-rate 0.02
+    OPENAI_BASE_URL=http://127.0.0.1:8000/v1 OPENAI_API_KEY=test python pregenerate.py ...
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _estimate_tokens(text):
+    return len(text) // 4 + 1
+
+
+def fake_reply(messages):
+    """A plausible answer for the request, based on what the prompt asks for."""
+    system = messages[0]["content"] if messages and messages[0]["role"] == "system" else ""
+    last = messages[-1]["content"] if messages else ""
+
+    if "You are an input validator" in last:
+        return ("JOB_VALID: true\nJOB_REASON: This is a recognized job title.\n"
+                "INPUT_VALID: true\nINPUT_REASON: The input is empty or real text.")
+    if "running notes for a mock job interview" in last:
+        return "- Asked about past projects\n- Candidate gave structured answers"
+    if "valid JSON" in system:
+        questions = [
+            {"question": f"Sample question {i}?", "hint": "Problem solving",
+             "id": i, "what_is_tested": "Problem solving", "model_answer": "A structured answer.",
+             "red_flags": "Vague answers", "follow_up_questions": ["Why?", "What else?"]}
+            for i in range(1, 4)
+        ]
+        return json.dumps({
+            "role": "Sample role", "prep_type": "Technical Questions", "difficulty": "Medium",
+            "questions": questions, "quick_tips": ["Be specific", "Use examples", "Ask questions"],
+            "preparation_strategy": "Practice daily.", "estimated_prep_time": "1-2 weeks",
+            "resources": ["Docs", "Practice platform"],
+        }, indent=2)
+    return ("Thanks for joining. **Question 1:** Tell me about a project you're proud of.\n\n"
+            "**What they're testing:** ownership and communication.")
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    options = {
+        "latency": 0.0,          # Seconds before the first byte
+        "token_rate": 0.0,       # Completion tokens per second (0 = instant)
+        "error_rate": 0.0,       # Share of requests answered with a 503
+        "rate_limit_rate": 0.0,  # Share of requests answered with a 429 + Retry-After
+        "retry_after": 0.1,
+    }
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        messages = body.get("messages", [])
+        reply = fake_reply(messages)
+        prompt_tokens = sum(_estimate_tokens(m.get("content", "")) for m in messages)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": _estimate_tokens(reply),
+            "total_tokens": prompt_tokens + _estimate_tokens(reply),
+        }
+        time.sleep(self.options["latency"])
+
+        roll = random.random()
+        if roll < self.options["rate_limit_rate"]:
+            self._send_json({"error": {"message": "Rate limit reached (mock)", "type": "requests"}},
+                            status=429, headers={"Retry-After": str(self.options["retry_after"])})
+            return
+        if roll < self.options["rate_limit_rate"] + self.options["error_rate"]:
+            self._send_json({"error": {"message": "Service unavailable (mock)", "type": "server_error"}},
+                            status=503)
+            return
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = body.get("model", "mock")
+        if body.get("stream"):
+            self._stream(completion_id, model, reply, usage, body)
+        else:
+            if self.options["token_rate"]:
+                time.sleep(usage["completion_tokens"] / self.options["token_rate"])
+            self._send_json({
+                "id": completion_id, "object": "chat.completion", "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": reply}}],
+                "usage": usage,
+            })
+
+    def _send_json(self, payload, status=200, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, completion_id, model, reply, usage, body):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+
+        def send(choices, **extra):
+            chunk = {"id": completion_id, "object": "chat.completion.chunk",
+                     "created": int(time.time()), "model": model, "choices": choices, **extra}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        # 8 characters is ~2 tokens per chunk
+        pause = 2 / self.options["token_rate"] if self.options["token_rate"] else 0
+        for i in range(0, len(reply), 8):
+            send([{"index": 0, "delta": {"content": reply[i:i + 8]}, "finish_reason": None}])
+            if pause:
+                time.sleep(pause)
+        send([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if body.get("stream_options", {}).get("include_usage"):
+            send([], usage=usage)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def start_server(host="127.0.0.1", port=0, **options):
+    """Start the mock server on a background thread; returns (server, base_url)."""
+    handler = type("ConfiguredMockHandler", (MockHandler,), {"options": {**MockHandler.options, **options}})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before answering")
+    parser.add_argument("--token-rate", type=float, default=0.0, help="Completion tokens per second (0 = instant)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests failing with 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests failing with 429")
+    args = parser.parse_args()
+
+    server, base_url = start_server(
+        args.host, args.port,
+        latency=args.latency, token_rate=args.token_rate,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+    )
+    print(f"Mock OpenAI API listening on {base_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import metrics
+import scheduler
+from coalesce import SingleFlight
+from response_cache import request_key
+
+# One OpenAI client per process, shared by every Streamlit session and module.
+# All model calls go through chat_completion(), which adds retries with jittered
+# exponential backoff (honoring Retry-After) and a circuit breaker.
+#
+# openai, httpx and dotenv are only imported when the client is first needed
+# (about half a second), so importing this module never delays the first render.
+
+MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", 100))
+MAX_KEEPALIVE = int(os.getenv("OPENAI_MAX_KEEPALIVE", 20))
+CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", 5))
+READ_TIMEOUT = float(os.getenv("OPENAI_READ_TIMEOUT", 60))  # Per chunk when streaming
+
+MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", 3))
+BACKOFF_BASE = 0.5   # Seconds before the first retry
+BACKOFF_MAX = 20.0   # Never sleep longer than this between attempts
+
+BREAKER_THRESHOLD = 5   # Consecutive upstream failures before failing fast
+BREAKER_COOLDOWN = 30   # Seconds to fail fast before letting a trial request through
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the API while the upstream is considered down."""
+
+
+class CircuitBreaker:
+    """Fails fast after repeated upstream failures instead of hanging every session."""
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.opened_at is None:
+                return
+            remaining = self.opened_at + self.cooldown - time.monotonic()
+            if remaining > 0 or self._trial_in_flight:
+                raise CircuitOpenError(
+                    f"OpenAI is currently unavailable; retrying in {max(remaining, 1):.0f}s."
+                )
+            self._trial_in_flight = True  # Half-open: let exactly one request probe
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+
+_client = None
+_client_lock = threading.Lock()
+_warm_up_started = False
+_dotenv_loaded = False
+breaker = CircuitBreaker()
+_single_flight = SingleFlight()
+
+
+def get_api_key():
+    """API key from Streamlit secrets, falling back to the environment / .env file."""
+    global _dotenv_loaded
+    try:
+        import streamlit as st
+        return st.secrets["OPENAI_API_KEY"]
+    except Exception:
+        if not _dotenv_loaded:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _dotenv_loaded = True
+        return os.getenv("OPENAI_API_KEY")
+
+
+def get_client():
+    """The process-wide OpenAI client (created on first use)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import httpx
+                from openai import OpenAI
+
+                http_client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=MAX_CONNECTIONS,
+                        max_keepalive_connections=MAX_KEEPALIVE,
+                    ),
+                    timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+                )
+                # Retries are handled in chat_completion so they share the circuit breaker
+                _client = OpenAI(api_key=get_api_key(), http_client=http_client, max_retries=0)
+    return _client
+
+
+def warm_up():
+    """Build the client on a background thread, once per process.
+
+    Called after the page has rendered so the first model call doesn't pay for
+    importing the SDK, without the UI ever waiting on it.
+    """
+    global _warm_up_started
+    if _warm_up_started:
+        return
+    _warm_up_started = True
+    threading.Thread(target=_warm_up, name="openai-warm-up", daemon=True).start()
+
+
+def _warm_up():
+    try:
+        get_client()
+    except Exception:
+        pass  # The first real call reports the problem
+
+
+def _retry_after(error):
+    """Seconds requested by a Retry-After header, if the error carries one."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    value = response.headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+def _is_retryable(error):
+    import openai
+    if isinstance(error, openai.APIConnectionError):  # Includes timeouts
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code in RETRYABLE_STATUS
+
+
+def _is_upstream_failure(error):
+    # Rate limits mean the API is up, so they don't count towards the breaker
+    import openai
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def backoff_delay(attempt, error=None):
+    """Full-jitter exponential backoff, overridden by the server's Retry-After."""
+    retry_after = _retry_after(error) if error is not None else None
+    if retry_after is not None:
+        return min(retry_after, BACKOFF_MAX)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def chat_completion(tags=None, coalesce=None, **kwargs):
+    """client.chat.completions.create with retries, backoff and the circuit breaker.
+
+    With stream=True only opening the stream is retried; errors mid-stream are raised.
+    `tags` (see metrics.tags) label the call for instrumentation and tell the scheduler
+    which session and priority it belongs to. Non-streaming calls are recorded here;
+    streams are recorded by streaming.stream_completion once done.
+
+    Identical non-streaming requests in flight at the same time share one API call
+    (see coalesce.py) when temperature is 0, or when the caller passes coalesce=True
+    because any sample will do; coalesce=False never shares.
+    """
+    if coalesce is None:
+        coalesce = kwargs.get("temperature") == 0
+    if not coalesce or kwargs.get("stream"):
+        return _tracked_completion(tags, kwargs)
+
+    started = time.perf_counter()
+    ran = []  # Set when this caller made the API call itself (and so already recorded it)
+
+    def call():
+        ran.append(True)
+        return _tracked_completion(tags, kwargs)
+
+    try:
+        response, shared = _single_flight.call(request_key(kwargs), call)
+    except Exception as error:
+        if not ran:  # Shared the leader's failure
+            metrics.record(dict(tags or {}, coalesced=True), kwargs.get("model"), metrics.outcome_of(error),
+                           time.perf_counter() - started)
+        raise
+    if shared:
+        # The leader's call was recorded with its tokens; this one cost nothing extra
+        wall = time.perf_counter() - started
+        metrics.record(dict(tags or {}, coalesced=True), kwargs.get("model"), "ok", wall, ttfb=wall)
+    return response
+
+
+def _tracked_completion(tags, kwargs):
+    started = time.perf_counter()
+    try:
+        queued = scheduler.acquire(kwargs, tags)
+        if tags is not None:
+            tags["queued"] = round(queued, 4)
+        response = _create_with_retries(**kwargs)
+    except Exception as error:
+        metrics.record(tags, kwargs.get("model"), metrics.outcome_of(error), time.perf_counter() - started)
+        raise
+    if not kwargs.get("stream"):
+        wall = time.perf_counter() - started
+        usage = getattr(response, "usage", None)
+        metrics.record(
+            tags, kwargs.get("model"), "ok", wall, ttfb=wall,
+            prompt_tokens=getattr(usage, "prompt_tokens", 0),
+            completion_tokens=getattr(usage, "completion_tokens", 0),
+        )
+    return response
+
+
+def _create_with_retries(**kwargs):
+    client = get_client()
+    attempt = 0
+    while True:
+        breaker.before_call()
+        try:
+            response = client.chat.completions.create(**kwargs)
+        except Exception as error:
+            if _is_upstream_failure(error):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            if attempt >= MAX_RETRIES or not _is_retryable(error):
+                raise
+            time.sleep(backoff_delay(attempt, error))
+            attempt += 1
+            continue
+        breaker.record_success()
+        return response
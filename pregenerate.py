@@ -0,0 +1,129 @@
+"""Pre-generate interview prep for every role x difficulty x prep type x technique.
+
+Results go to the question bank (see question_bank.py), which app.py serves with
+zero model latency whenever a request matches, including its sampling settings,
+and the input box is empty. The defaults match the app's default settings.
+Answers of the JSON techniques are checked against their schema (and repaired
+once) like live ones; an answer that still isn't valid is not stored.
+Re-running skips combinations already in the bank, so an interrupted or partly
+failed run resumes where it stopped.
+
+    python pregenerate.py "Software Engineer" "Data Scientist" --workers 8
+    python pregenerate.py --roles-file roles.txt --techniques "Zero-Shot" "JSON Basic"
+
+Offline, against the local stand-in server:
+
+    python mock_openai_server.py --port 8000 &
+    python pregenerate.py "Nurse" --base-url http://127.0.0.1:8000/v1
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from json_stream import PrepParser, finalize
+from prompts import PROMPT_TECHNIQUES, DIFFICULTIES, PREP_TYPES, build_user_prompt
+from question_bank import BANK_PATH, QuestionBank
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("roles", nargs="*", help="Job roles to generate for")
+    parser.add_argument("--roles-file", help="File with one job role per line")
+    parser.add_argument("--difficulties", nargs="+", default=DIFFICULTIES, choices=DIFFICULTIES)
+    parser.add_argument("--prep-types", nargs="+", default=PREP_TYPES, choices=PREP_TYPES)
+    parser.add_argument("--techniques", nargs="+", default=list(PROMPT_TECHNIQUES), choices=list(PROMPT_TECHNIQUES))
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--temperature", type=float, default=0.7)
+    parser.add_argument("--max-tokens", type=int, default=1000)
+    parser.add_argument("--top-p", type=float, default=1.0)
+    parser.add_argument("--frequency-penalty", type=float, default=0.0)
+    parser.add_argument("--presence-penalty", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent requests (default: 4)")
+    parser.add_argument("--db", default=BANK_PATH, help=f"Question bank path (default: {BANK_PATH})")
+    parser.add_argument("--base-url", help="OpenAI-compatible endpoint, e.g. the local mock server")
+    args = parser.parse_args(argv)
+
+    if args.roles_file:
+        with open(args.roles_file, encoding="utf-8") as f:
+            args.roles += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if not args.roles:
+        parser.error("give at least one role (or --roles-file)")
+    return args
+
+
+def sampling(args):
+    """The sampling settings every request is made with (and bank entries are keyed on)."""
+    return dict(temperature=args.temperature, max_tokens=args.max_tokens, top_p=args.top_p,
+                frequency_penalty=args.frequency_penalty, presence_penalty=args.presence_penalty)
+
+
+def generate_one(bank, args, role, difficulty, prep_type, technique):
+    # Imported here so --base-url is in the environment before the client is built
+    from openai_client import chat_completion
+
+    def complete(request):
+        return chat_completion(model=args.model, **request).choices[0].message.content
+
+    request = dict(
+        messages=[
+            {"role": "system", "content": PROMPT_TECHNIQUES[technique]["system_prompt"]},
+            {"role": "user", "content": build_user_prompt(role, prep_type, difficulty)},
+        ],
+        **sampling(args),
+    )
+    content = complete(request)
+    if not content:
+        raise ValueError("empty completion")
+    if PROMPT_TECHNIQUES[technique].get("json"):
+        parser = PrepParser(technique)
+        parser.feed(content)
+        parsed, problems = finalize(parser, request, complete)
+        if problems:
+            raise ValueError("invalid JSON: " + ", ".join(problems))
+        content = json.dumps(parsed, indent=2)
+    bank.put(role, difficulty, prep_type, technique, args.model, sampling(args), content)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.base_url:
+        os.environ["OPENAI_BASE_URL"] = args.base_url
+        os.environ.setdefault("OPENAI_API_KEY", "local-stand-in")
+
+    bank = QuestionBank(args.db)
+    combos = [
+        (role, difficulty, prep_type, technique)
+        for role in dict.fromkeys(args.roles)
+        for difficulty in args.difficulties
+        for prep_type in args.prep_types
+        for technique in args.techniques
+    ]
+    todo = [c for c in combos if not bank.has(*c, args.model, sampling(args))]
+    print(f"{len(combos)} combinations, {len(combos) - len(todo)} already in {args.db}, {len(todo)} to generate")
+
+    started = time.perf_counter()
+    failed = 0
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(generate_one, bank, args, *combo): combo for combo in todo}
+        for done, future in enumerate(as_completed(futures), start=1):
+            combo = futures[future]
+            try:
+                future.result()
+                status = "ok"
+            except Exception as e:
+                failed += 1
+                status = f"FAILED ({e})"
+            print(f"[{done}/{len(todo)}] {' | '.join(combo)}: {status}")
+
+    elapsed = time.perf_counter() - started
+    print(f"Done in {elapsed:.1f}s: {len(todo) - failed} generated, {failed} failed, {bank.count()} entries in bank")
+    if failed:
+        print("Re-run the same command to retry the failed combinations.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
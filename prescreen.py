@@ -0,0 +1,159 @@
+import math
+import os
+import re
+from collections import Counter
+
+import job_titles
+
+# Local, network-free pre-screening for job roles and user input.
+# Each screen returns (verdict, reason); only UNSURE cases need the LLM validator.
+ACCEPT = "accept"
+REJECT = "reject"
+UNSURE = "unsure"
+
+MAX_ROLE_LENGTH = 100
+MAX_INPUT_LENGTH = 10000  # Prevent extremely long inputs (API abuse)
+
+# Prompt-injection phrases, matched case-insensitively as whole words. Single words
+# like "ignore" or "bypass" are too common in real job descriptions ("coronary bypass
+# surgery", "never ignore failing tests"), so each pattern needs the instruction-shaped
+# phrase around them.
+_TARGET = r"(?:all |any |the |your |my |these |those |previous |prior |above |earlier |system )*"
+BLOCKED_PHRASES = [
+    r"ignore " + _TARGET + r"(?:instructions?|prompts?|rules|directions|guidelines)",
+    r"disregard " + _TARGET + r"(?:instructions?|prompts?|rules|directions|guidelines)",
+    r"forget " + _TARGET + r"(?:instructions?|prompts?|rules|guidelines)",
+    r"override " + _TARGET + r"(?:instructions?|prompts?|rules|restrictions|guidelines|safety)",
+    r"bypass " + _TARGET + r"(?:instructions?|rules|restrictions|filters?|guidelines|safety)",
+    r"remove " + _TARGET + r"(?:restrictions|filters?|guidelines|rules)",
+    r"pretend (?:that )?you(?: are|'re)",
+    r"you (?:have|has) no (?:rules|guidelines|restrictions)",
+    r"(?:reveal|print|show|repeat) " + _TARGET + r"prompt",
+    r"system prompt",
+    r"jailbreak(?:s|ing)?",
+]
+_INJECTION_RE = re.compile(r"\b(?:" + "|".join(BLOCKED_PHRASES) + r")\b", re.IGNORECASE)
+
+# Inputs of at least this many words (pasted job descriptions) that hit a blocked
+# phrase go to the model instead of being rejected locally
+INJECTION_REVIEW_WORDS = 40
+
+_KEYBOARD_ROWS = ["qwertyuiop", "asdfghjkl", "zxcvbnm", "1234567890"]
+_KEYBOARD_RUN_LENGTH = 4
+# Every 4-character run along a keyboard row, forwards and backwards ("asdf", "fdsa", ...)
+_KEYBOARD_RUN_RE = re.compile("|".join(sorted({
+    run
+    for row in _KEYBOARD_ROWS
+    for line in (row, row[::-1])
+    for run in (line[i:i + _KEYBOARD_RUN_LENGTH] for i in range(len(line) - _KEYBOARD_RUN_LENGTH + 1))
+})))
+_REPEAT_RE = re.compile(r"([a-z])\1{3,}")  # "aaaa"
+_WORD_RE = re.compile(r"[a-z]+(?:'[a-z]+)?")
+_VOWELS = set("aeiouy")
+
+_DICTIONARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "common_words.txt")
+_dictionary = None
+
+
+def _load_dictionary():
+    global _dictionary
+    if _dictionary is None:
+        with open(_DICTIONARY_PATH, encoding="utf-8") as f:
+            _dictionary = frozenset(line.strip() for line in f if line.strip())
+    return _dictionary
+
+
+def contains_injection(text):
+    """True if the text contains a known prompt-injection phrase."""
+    return _INJECTION_RE.search(text) is not None
+
+
+def char_entropy(text):
+    """Shannon entropy (bits per character) of the non-space characters."""
+    chars = [c for c in text if not c.isspace()]
+    if not chars:
+        return 0.0
+    total = len(chars)
+    return -sum(n / total * math.log2(n / total) for n in Counter(chars).values())
+
+
+def vowel_ratio(words):
+    """Share of vowels among letters, ignoring short all-caps-style tokens like 'SWE'."""
+    letters = "".join(w for w in words if len(w) > 4)
+    if not letters:
+        return None
+    return sum(c in _VOWELS for c in letters) / len(letters)
+
+
+def dictionary_coverage(words):
+    """Share of words found in the bundled common-words list."""
+    if not words:
+        return 0.0
+    dictionary = _load_dictionary()
+    return sum(w in dictionary for w in words) / len(words)
+
+
+def _looks_smashed(lowered):
+    return _KEYBOARD_RUN_RE.search(lowered) is not None or _REPEAT_RE.search(lowered) is not None
+
+
+def screen_role(role):
+    """Pre-screen a job role string."""
+    role = (role or "").strip()
+    if not role:
+        return REJECT, "The job role is empty."
+    if len(role) > MAX_ROLE_LENGTH:
+        return REJECT, "The job role is too long to be a job title."
+    if contains_injection(role):
+        return REJECT, "The job role contains blocked instructions."
+
+    lowered = role.lower()
+    words = _WORD_RE.findall(lowered)
+    if not words:
+        return REJECT, "The job role contains no words."
+
+    # Only exact (normalized) matches are accepted; the prompts use the role as typed,
+    # so a typo close to a known title is left to the model
+    title = job_titles.lookup(role, fuzzy=False)
+    if title is not None:
+        return ACCEPT, f"'{role}' matches the recognized job title '{title.title()}'."
+
+    if _REPEAT_RE.search(lowered):
+        return REJECT, "The job role looks like random keyboard input."
+    if _KEYBOARD_RUN_RE.search(lowered):
+        return UNSURE, ""  # "asdf", but also "Property Manager": the model decides
+    ratio = vowel_ratio(words)
+    if ratio is not None and (ratio < 0.15 or ratio > 0.8):
+        return REJECT, "The job role doesn't look like real words."
+    return UNSURE, ""
+
+
+def screen_input(text):
+    """Pre-screen the optional free-text input (job description, topic, ...)."""
+    text = (text or "").strip()
+    if not text:
+        return ACCEPT, "No additional input provided, which is fine."
+    if len(text) > MAX_INPUT_LENGTH:
+        return REJECT, f"The input is longer than {MAX_INPUT_LENGTH} characters."
+    lowered = text.lower()
+    words = _WORD_RE.findall(lowered)
+    if contains_injection(text):
+        if len(words) >= INJECTION_REVIEW_WORDS:
+            return UNSURE, ""  # A long job description may quote such a phrase; the model checks
+        return REJECT, "The input contains blocked instructions."
+    if not words:
+        return REJECT, "The input contains no words."
+
+    coverage = dictionary_coverage(words)
+    ratio = vowel_ratio(words)
+    vowels_ok = ratio is None or 0.25 <= ratio <= 0.55
+
+    if len(words) >= 4 and coverage >= 0.4 and vowels_ok:
+        return ACCEPT, "The input reads like real text."
+    if coverage == 0 and (
+        _looks_smashed(lowered)
+        or not vowels_ok
+        or (len(text) >= 8 and char_entropy(lowered) < 2.0)
+    ):
+        return REJECT, "The input looks like gibberish."
+    return UNSURE, ""
@@ -0,0 +1,110 @@
+import json
+import os
+import threading
+
+from speculative import Prefetch, discard, submit
+from streaming import stream_completion
+
+# Speculative pre-warm of the mock interview. While the user is on the setup screen,
+# validation and the interviewer's opening are requested in the background once the
+# settings have stopped changing for DEBOUNCE_SECONDS. Clicking Start then only has
+# to check that the pre-warm was made for exactly the current settings and replay
+# it. Anything that changes the settings discards it, and each session may start at
+# most MAX_PER_SESSION pre-warms so idle edits can't run up cost.
+
+ENABLED = os.getenv("PREWARM_ENABLED", "1") != "0"
+DEBOUNCE_SECONDS = float(os.getenv("PREWARM_DEBOUNCE", 1.5))
+MAX_PER_SESSION = int(os.getenv("PREWARM_MAX_PER_SESSION", 3))
+
+
+def config_key(role, difficulty, technique, model_settings):
+    """Identity of everything the validation and opening depend on."""
+    return json.dumps([role, difficulty, technique, model_settings], sort_keys=True)
+
+
+class Prewarm:
+    """Validation plus opening for one config, fired after the debounce delay.
+
+    `validate()` and `build()`, which returns the opening's (request kwargs, tags),
+    run off the script thread, so they must not touch st.* (make metric tags up front).
+    """
+
+    def __init__(self, key, validate, build, delay=DEBOUNCE_SECONDS):
+        self.key = key
+        self.validation = None  # Future of validate()'s result
+        self.opening = None     # Prefetch of the opening's deltas
+        self.timings = {}
+        self._validate = validate
+        self._build = build
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._timer = threading.Timer(delay, self._fire)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _fire(self):
+        with self._lock:
+            if self._cancelled:
+                return
+            self.validation = submit(self._validate)
+            self.opening = Prefetch(self._open())
+        self.validation.add_done_callback(self._check_validation)
+
+    def _open(self):
+        request, tags = self._build()  # May wait for a job description digest
+        yield from stream_completion(timings=self.timings, tags=tags, **request)
+
+    def _check_validation(self, future):
+        # Stop generating the opening as soon as the role turns out to be invalid
+        if future.cancelled() or future.exception() is not None or not future.result()[0]:
+            discard(self.opening)
+
+    def claim(self):
+        """Stop the timer; returns True if the requests were already sent."""
+        with self._lock:
+            self._cancelled = True
+            self._timer.cancel()
+            return self.validation is not None
+
+    def cancel(self):
+        """Stop the timer and discard anything sent; returns True if requests were sent."""
+        fired = self.claim()
+        if fired:
+            self.validation.cancel()
+            discard(self.opening)
+        return fired
+
+
+class PrewarmSlot:
+    """One session's pending pre-warm and how many it has started (kept in st.session_state)."""
+
+    def __init__(self, limit=MAX_PER_SESSION):
+        self.limit = limit
+        self.started = 0
+        self.current = None
+
+    def update(self, key, validate, build):
+        """Schedule a pre-warm for `key` unless one is already pending; drops any other."""
+        if not ENABLED or (self.current is not None and self.current.key == key):
+            return
+        self.clear()
+        if self.started >= self.limit:
+            return
+        self.started += 1  # Given back if it is dropped before it fires
+        self.current = Prewarm(key, validate, build)
+
+    def take(self, key):
+        """The pre-warm for `key` if its requests were sent, else None; the slot is emptied."""
+        current, self.current = self.current, None
+        if current is not None and current.key == key and current.claim():
+            return current
+        self._drop(current)
+        return None
+
+    def clear(self):
+        current, self.current = self.current, None
+        self._drop(current)
+
+    def _drop(self, prewarm):
+        if prewarm is not None and not prewarm.cancel():
+            self.started -= 1  # Never fired, so it doesn't count against the cap
@@ -1,3 +1,8 @@
+import json
+from string import Formatter
+
+from history import estimate_tokens
+
 PROMPT_TECHNIQUES = {
     "Zero-Shot": {
         "label": "🎯 Zero-Shot",
@@ -54,6 +59,7 @@ Always show all 4 steps in your response before the final output. Label each ste
 
  "JSON Basic": {
     "label": "🧾 JSON Basic",
+    "json": True,  # Answers follow the example JSON in the system prompt (see JSON_SCHEMAS)
     "description": "Returns interview questions in a simple, clean JSON structure.",
     "system_prompt": """You are an expert interview coach. You ALWAYS respond in valid JSON format only.
 No text before or after the JSON. Use this exact structure:
@@ -83,6 +89,7 @@ Generate at least 3 questions. Ensure valid JSON with proper escaping."""
 
 "JSON Detailed": {
     "label": "🗃️ JSON Detailed",
+    "json": True,
     "description": "Returns comprehensive interview questions with model answers and evaluation criteria.",
     "system_prompt": """You are an expert interview coach. You ALWAYS respond in valid JSON format only.
 No text before or after the JSON. Use this exact structure:
@@ -126,3 +133,167 @@ Generate exactly 3 questions. Ensure all JSON is valid and properly escaped."""
 }
 }
 
+
+
+# --- OPTIONS SHARED BY THE UI AND THE BATCH PIPELINE ---
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+
+# One-shot prep types (Mock Interview is the chatbot mode and is handled separately)
+PREP_TYPES = [
+    "Technical Questions",
+    "Behavioral Questions (STAR method)",
+    "Questions to ask the Interviewer",
+    "Analyze a Job Description",
+]
+
+
+# --- TEMPLATE REGISTRY ---
+# User messages are rendered from these templates instead of ad hoc f-strings.
+# Static instructions come first and per-request fields last, so requests for the
+# same technique share a byte-identical prefix (system prompt + static text),
+# which is what provider-side prompt caching matches on.
+
+class PromptTemplate:
+    """Static text followed by `{field}` placeholders; optional sections are left out when empty."""
+
+    def __init__(self, name, static, fields, optional=None):
+        self.name = name
+        self.static = static
+        self.fields = fields
+        self.optional = optional or {}  # field -> section appended only when that value is non-blank
+        self.required = self._parse(fields)
+        for field, section in self.optional.items():
+            if field not in self._parse(section):
+                raise ValueError(f"Prompt template {name!r}: optional section for {field!r} never uses it")
+        self.source = static + fields + "".join(self.optional.values())
+        self.static_tokens = estimate_tokens(static)
+
+    def _parse(self, text):
+        names = set()
+        try:
+            parsed = list(Formatter().parse(text))
+        except ValueError as e:
+            raise ValueError(f"Prompt template {self.name!r}: {e}") from None
+        for _, field, _, _ in parsed:
+            if field is None:
+                continue
+            if not field.isidentifier():
+                raise ValueError(f"Prompt template {self.name!r}: bad placeholder {{{field}}}")
+            names.add(field)
+        return names
+
+    def render(self, **values):
+        missing = self.required - set(values)
+        if missing:
+            raise KeyError(f"Prompt template {self.name!r} needs {', '.join(sorted(missing))}")
+        text = self.static + self.fields.format(**values)
+        for field, section in self.optional.items():
+            if str(values.get(field) or "").strip():
+                text += section.format(**values)
+        return text
+
+    def estimate_tokens(self, text):
+        """Token estimate for a rendering of this template; the static part is counted once at import."""
+        return self.static_tokens + estimate_tokens(text[len(self.static):])
+
+
+TEMPLATES = {t.name: t for t in [
+    # One-shot generate request (the technique's system prompt is its static prefix)
+    PromptTemplate(
+        "generate",
+        static="",
+        fields="Preparation Type: {prep_type}\nDifficulty: {difficulty}\nJob Role: {role}",
+        optional={"user_input": "\n\nAdditional context:\n{user_input}"},
+    ),
+    # First message of a mock interview
+    PromptTemplate(
+        "interview_opening",
+        static="""You are about to conduct a mock job interview. Start by:
+1. Briefly introducing yourself as the interviewer
+2. Asking your first interview question
+
+Keep it conversational and professional.
+
+""",
+        fields="Role: {role}\nDifficulty: {difficulty}",
+        optional={"job_description": "\n\nJOB DESCRIPTION:\n{job_description}"},
+    ),
+    # Condensing a long job description once (see jd_digest.py)
+    PromptTemplate(
+        "jd_digest",
+        static="""Condense the job description below for an interview preparation tool.
+Reply with JSON only, in exactly this format:
+{"seniority": "level and years of experience asked for", "responsibilities": ["..."], "required_skills": ["..."], "tech_stack": ["..."]}
+
+Use at most 6 short phrases per list and an empty list when the description says nothing about it.
+Leave out company boilerplate, benefits and legal text.
+
+""",
+        fields="JOB DESCRIPTION:\n{job_description}",
+    ),
+    # Follow-up when a JSON answer came back cut off or partly malformed
+    PromptTemplate(
+        "json_repair",
+        static="""Part of your previous answer was cut off or was not valid JSON. The valid parts were kept.
+Reply with valid JSON only: a single object containing just the missing keys listed below,
+in the same format as before. No text before or after the JSON.
+
+""",
+        fields="Missing keys, with an example value for each:\n{shape}",
+        optional={"count": "\n\nWrite {count} new question(s) under \"questions\". Do not repeat these:\n{asked}"},
+    ),
+]}
+
+# Memoized once per process; the system prompt is the bulk of every request
+SYSTEM_PROMPT_TOKENS = {name: estimate_tokens(t["system_prompt"]) for name, t in PROMPT_TECHNIQUES.items()}
+_TOKENS_BY_TEXT = {t["system_prompt"]: SYSTEM_PROMPT_TOKENS[name] for name, t in PROMPT_TECHNIQUES.items()}
+_STATIC_TEMPLATES = [t for t in TEMPLATES.values() if t.static]
+
+
+def content_tokens(text):
+    """Token estimate for a message's text, using the memoized counts of known prompts."""
+    if text in _TOKENS_BY_TEXT:
+        return _TOKENS_BY_TEXT[text]
+    for template in _STATIC_TEMPLATES:
+        if text.startswith(template.static):
+            return template.estimate_tokens(text)
+    return estimate_tokens(text)
+
+
+def prompt_tokens(messages):
+    """Token estimate for chat messages, counting each message's role/formatting overhead."""
+    return sum(content_tokens(m.get("content") or "") + 4 for m in messages)
+
+
+def render(template, **values):
+    return TEMPLATES[template].render(**values)
+
+
+def build_user_prompt(role, prep_type, difficulty, user_input=""):
+    """User message for the one-shot generate request."""
+    return render("generate", role=role, prep_type=prep_type, difficulty=difficulty, user_input=user_input)
+
+
+# Parsed example output of the JSON techniques, used as their schema (see json_stream.py)
+JSON_SCHEMAS = {}
+
+
+def _validate_techniques():
+    # Fail at import rather than in a user's request
+    for name, technique in PROMPT_TECHNIQUES.items():
+        for key in ("label", "description", "system_prompt"):
+            if not isinstance(technique.get(key), str) or not technique[key].strip():
+                raise ValueError(f"Prompt technique {name!r} is missing {key!r}")
+        system_prompt = technique["system_prompt"]
+        if technique.get("json"):
+            example = system_prompt[system_prompt.find("{"):system_prompt.rfind("}") + 1]
+            try:
+                schema = json.loads(example)
+            except ValueError as e:
+                raise ValueError(f"Prompt technique {name!r}: example JSON is invalid ({e})") from None
+            if not isinstance(schema.get("questions"), list) or not schema["questions"]:
+                raise ValueError(f"Prompt technique {name!r}: example JSON needs a questions list")
+            JSON_SCHEMAS[name] = schema
+
+
+_validate_techniques()
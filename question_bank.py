@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from prompts import PROMPT_TECHNIQUES, TEMPLATES
+from validation_cache import normalize_role
+
+# Pre-generated interview prep, filled offline by pregenerate.py and served by app.py
+# for requests with an empty input box. Entries remember a hash of the technique's
+# system prompt, the generate template and the sampling settings they were made
+# with, so editing a prompt makes old entries miss until regenerated, and a request
+# with other settings (temperature 0, a smaller max_tokens) is never served them.
+
+BANK_PATH = os.getenv("QUESTION_BANK_PATH", os.path.join("data", "question_bank.sqlite3"))
+
+
+SAMPLING_PARAMS = ("temperature", "max_tokens", "top_p", "frequency_penalty", "presence_penalty")
+
+
+def sampling_key(request):
+    """Canonical text of a request's sampling settings (dict with SAMPLING_PARAMS)."""
+    values = {name: request.get(name) for name in SAMPLING_PARAMS}
+    values = {name: round(float(value), 2) if isinstance(value, float) else value for name, value in values.items()}
+    return json.dumps(values, sort_keys=True)
+
+
+def prompt_hash(technique, sampling):
+    """Short hash of a technique's current system prompt, the generate template and the sampling settings."""
+    source = PROMPT_TECHNIQUES[technique]["system_prompt"] + TEMPLATES["generate"].source + sampling_key(sampling)
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+
+
+class QuestionBank:
+    """SQLite table indexed on (role, difficulty, prep_type, technique, model)."""
+
+    def __init__(self, path=BANK_PATH, readonly=False):
+        self.path = path
+        self._lock = threading.Lock()
+        if readonly:
+            self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+            return
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS entries (
+                role TEXT NOT NULL,
+                difficulty TEXT NOT NULL,
+                prep_type TEXT NOT NULL,
+                technique TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt_hash TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (role, difficulty, prep_type, technique, model)
+            ) WITHOUT ROWID"""
+        )
+
+    def get(self, role, difficulty, prep_type, technique, model, sampling):
+        """Stored content for this combination, or None (missing, stale prompt or other settings)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, prompt_hash FROM entries "
+                "WHERE role = ? AND difficulty = ? AND prep_type = ? AND technique = ? AND model = ?",
+                (normalize_role(role), difficulty, prep_type, technique, model),
+            ).fetchone()
+        if row is None or row[1] != prompt_hash(technique, sampling):
+            return None
+        return row[0]
+
+    def has(self, role, difficulty, prep_type, technique, model, sampling):
+        return self.get(role, difficulty, prep_type, technique, model, sampling) is not None
+
+    def put(self, role, difficulty, prep_type, technique, model, sampling, content):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (normalize_role(role), difficulty, prep_type, technique, model,
+                 prompt_hash(technique, sampling), content, time.time()),
+            )
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+
+_bank = None
+_bank_lock = threading.Lock()
+
+
+def get_bank():
+    """Read-only bank for serving, or None if no bank has been generated yet."""
+    global _bank
+    if _bank is None and os.path.exists(BANK_PATH):
+        with _bank_lock:
+            if _bank is None:
+                _bank = QuestionBank(BANK_PATH, readonly=True)
+    return _bank
+
+
+def lookup(role, difficulty, prep_type, technique, model, sampling):
+    """Serve a pre-generated answer if the bank has one for this exact combination and settings."""
+    bank = get_bank()
+    if bank is None:
+        return None
+    try:
+        return bank.get(role, difficulty, prep_type, technique, model, sampling)
+    except sqlite3.Error:
+        return None
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+
+# Opt-in, content-addressed disk cache for generated interview prep.
+# The key is a hash of the full request (model, every message including the
+# technique's system prompt text, and all sampling params), so editing a prompt
+# in prompts.py automatically invalidates its entries.
+
+CACHE_DIR = os.getenv("RESPONSE_CACHE_DIR", os.path.join(".cache", "responses"))
+MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 50 * 1024 * 1024))  # 50 MB
+DEFAULT_VARIANTS = 3
+
+# Policies
+OFF = "off"
+DETERMINISTIC = "deterministic"  # Cache only temperature-0 requests (one stored answer)
+VARIANTS = "variants"            # Also cache sampled requests, serving one of K stored answers
+
+POLICY_LABELS = {
+    OFF: "Off",
+    DETERMINISTIC: "Only at temperature 0",
+    VARIANTS: f"Reuse up to {DEFAULT_VARIANTS} variants",
+}
+
+_lock = threading.Lock()
+_approx_bytes = None  # Running size estimate so we only walk the directory when over budget
+
+
+def request_key(request):
+    """Canonical SHA-256 of a chat.completions request (dict of create() kwargs)."""
+    canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _path(key):
+    return os.path.join(CACHE_DIR, key[:2], f"{key}.json")
+
+
+def _variants_wanted(request, policy, variants):
+    """How many stored answers this request should collect (0 = don't cache)."""
+    if policy == OFF:
+        return 0
+    if request.get("temperature", 1) == 0:
+        return 1
+    return variants if policy == VARIANTS else 0
+
+
+def cacheable(request, policy):
+    """Whether the policy stores answers to this request at all."""
+    return _variants_wanted(request, policy, DEFAULT_VARIANTS) > 0
+
+
+def get(request, policy, variants=DEFAULT_VARIANTS):
+    """Return a cached answer for the request, or None if it should be generated.
+
+    At temperature 0 the single stored answer is returned. With the VARIANTS policy,
+    sampled requests keep generating until `variants` answers are stored, then one
+    of them is served at random.
+    """
+    wanted = _variants_wanted(request, policy, variants)
+    if not wanted:
+        return None
+    path = _path(request_key(request))
+    try:
+        with open(path, encoding="utf-8") as f:
+            stored = json.load(f)["variants"]
+    except (OSError, ValueError, KeyError):
+        return None
+    if len(stored) < wanted:
+        return None
+    try:
+        os.utime(path)  # Mark as recently used for eviction
+    except OSError:
+        pass  # Evicted by another session since we read it; the answer is still good
+    return random.choice(stored)
+
+
+def put(request, result, policy, variants=DEFAULT_VARIANTS):
+    """Store an answer (if the policy caches this request) and enforce the size limit."""
+    global _approx_bytes
+    wanted = _variants_wanted(request, policy, variants)
+    if not wanted or not result:
+        return
+    key = request_key(request)
+    path = _path(key)
+    with _lock:
+        try:
+            with open(path, encoding="utf-8") as f:
+                stored = json.load(f)["variants"]
+        except (OSError, ValueError, KeyError):
+            stored = []
+        stored = (stored + [result])[-wanted:]
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "created_at": time.time(), "variants": stored}, f)
+        os.replace(temp_path, path)  # Atomic, so readers never see half a file
+
+        if _approx_bytes is None:
+            _approx_bytes = _evict()
+        else:
+            _approx_bytes += os.path.getsize(path)
+            if _approx_bytes > MAX_BYTES:
+                _approx_bytes = _evict()
+
+
+def _evict():
+    """Delete least recently used entries until the cache fits in MAX_BYTES.
+
+    Returns the resulting cache size in bytes.
+    """
+    entries = []
+    total = 0
+    for root, _, files in os.walk(CACHE_DIR):
+        for name in files:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+    if total <= MAX_BYTES:
+        return total
+    for _, size, path in sorted(entries):
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        if total <= MAX_BYTES:
+            break
+    return total
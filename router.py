@@ -0,0 +1,106 @@
+import os
+
+import metrics
+from prompts import prompt_tokens
+
+# Per-call model routing. The model picked in the sidebar is the most capable (and
+# priciest) model a session may use; each call is sent to SMALL_MODEL instead when
+# the selected model's estimated latency or cost for that task is over the routing
+# policy's budget. Calls that need the larger model go to it regardless: Hard
+# difficulty, and repairs after a broken JSON answer. Every decision is added to the
+# call's metric labels, so the time and spend saved can be measured.
+
+SMALL_MODEL = os.getenv("ROUTER_SMALL_MODEL", "gpt-4o-mini")
+
+OFF = "off"
+BALANCED = "balanced"
+ECONOMY = "economy"
+POLICY_LABELS = {
+    BALANCED: "Balanced (smaller model when within budget)",
+    ECONOMY: "Economy (smaller model unless it needs more)",
+    OFF: "Off (always the selected model)",
+}
+DEFAULT_POLICY = os.getenv("ROUTER_POLICY", BALANCED)
+if DEFAULT_POLICY not in POLICY_LABELS:
+    DEFAULT_POLICY = BALANCED
+
+TASKS = ["validate", "summary", "start_interview", "send_message", "generate", "generate_json"]
+
+# Per call: (latency budget in seconds, cost budget in USD). The selected model is
+# used when its estimate fits both, otherwise SMALL_MODEL.
+BUDGETS = {
+    BALANCED: {
+        "validate": (2, 0.0005),
+        "summary": (5, 0.001),
+        "start_interview": (6, 0.005),
+        "send_message": (4, 0.002),
+        "generate": (30, 0.02),
+        "generate_json": (30, 0.01),  # A broken answer is repaired on the selected model
+    },
+    ECONOMY: dict.fromkeys(TASKS, (0, 0)),
+}
+
+# Tasks that use the selected model for Hard difficulty whatever the budget says
+HARD_TASKS = {"start_interview", "send_message", "generate", "generate_json"}
+
+# (seconds to first token, output tokens per second); rough figures for estimates only
+MODEL_SPEED = {
+    "gpt-4o": (0.5, 90),
+    "gpt-4o-mini": (0.4, 110),
+    "gpt-4-turbo": (0.9, 35),
+    "gpt-3.5-turbo": (0.3, 120),
+}
+DEFAULT_SPEED = (0.8, 50)
+PROMPT_TOKENS_PER_SECOND = 20_000
+
+# Typical reply length; other tasks are assumed to use all of max_tokens
+TYPICAL_OUTPUT = {"validate": 40, "summary": 200, "start_interview": 150, "send_message": 150}
+DEFAULT_MAX_TOKENS = 1000
+
+
+def estimate(model, task, prompt, max_tokens=None):
+    """(seconds, USD) a call of `prompt` tokens is expected to take on `model`."""
+    max_tokens = max_tokens or DEFAULT_MAX_TOKENS
+    output = min(max_tokens, TYPICAL_OUTPUT.get(task, max_tokens))
+    ttft, rate = MODEL_SPEED.get(model, DEFAULT_SPEED)
+    seconds = ttft + prompt / PROMPT_TOKENS_PER_SECOND + output / rate
+    return seconds, metrics.cost_usd(model, prompt, output)
+
+
+def choose(task, model, prompt, max_tokens=None, difficulty=None, escalate=None, policy=DEFAULT_POLICY):
+    """(model to call, reason) for a task, given the selected model."""
+    if policy == OFF or policy not in BUDGETS:
+        return model, "routing off"
+    if model == SMALL_MODEL:
+        return model, "selected"
+    if escalate:
+        return model, f"escalated: {escalate}"
+    if difficulty == "Hard" and task in HARD_TASKS:
+        return model, "escalated: hard difficulty"
+    seconds, cost = estimate(model, task, prompt, max_tokens)
+    max_seconds, max_cost = BUDGETS[policy].get(task, (float("inf"), float("inf")))
+    if seconds > max_seconds:
+        return SMALL_MODEL, "over latency budget"
+    if cost > max_cost:
+        return SMALL_MODEL, "over cost budget"
+    return model, "within budget"
+
+
+def route(task, model, request, tags=None, difficulty=None, escalate=None, policy=DEFAULT_POLICY):
+    """Set request["model"] for a task and label the call with the decision.
+
+    `model` is the selected model. The labels (requested_model, route and the
+    estimated seconds saved) end up in the call's metrics; see metrics.record.
+    Returns the routed model.
+    """
+    prompt = prompt_tokens(request.get("messages", []))
+    routed, reason = choose(task, model, prompt, request.get("max_tokens"), difficulty, escalate, policy)
+    request["model"] = routed
+    if tags is not None:
+        tags["requested_model"] = model
+        tags["route"] = reason
+        if routed != model:
+            saved = estimate(model, task, prompt, request.get("max_tokens"))[0] - \
+                estimate(routed, task, prompt, request.get("max_tokens"))[0]
+            tags["est_saved_seconds"] = round(saved, 3)
+    return routed
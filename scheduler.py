@@ -0,0 +1,202 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+from prompts import prompt_tokens
+
+# Process-wide admission control for model calls. Every call made through
+# openai_client.chat_completion waits here until the model's requests-per-minute
+# and tokens-per-minute buckets have room, so a traffic spike queues instead of
+# turning into a wall of 429s. Waiting calls are served by priority (interview
+# turns before bulk generation) and round-robin across sessions within a priority.
+
+ENABLED = os.getenv("SCHEDULER_ENABLED", "1") != "0"
+QUEUE_TIMEOUT = float(os.getenv("SCHEDULER_QUEUE_TIMEOUT", 120))  # Seconds before giving up
+
+# (requests per minute, tokens per minute); OPENAI_RPM / OPENAI_TPM override every model
+MODEL_LIMITS = {
+    "gpt-4o": (500, 30_000),
+    "gpt-4o-mini": (500, 200_000),
+    "gpt-4-turbo": (500, 30_000),
+    "gpt-3.5-turbo": (3_500, 200_000),
+}
+DEFAULT_LIMITS = (500, 30_000)
+DEFAULT_MAX_TOKENS = 1000  # Completion budget assumed when a request doesn't set max_tokens
+
+INTERACTIVE = 0  # Someone is waiting on the reply mid-conversation
+BULK = 1         # One-shot generation, repairs, batch jobs
+PRIORITIES = {"validate": INTERACTIVE, "start_interview": INTERACTIVE, "send_message": INTERACTIVE,
+              "summary": INTERACTIVE}
+
+
+class QueueTimeout(Exception):
+    """Raised when a call waited longer than QUEUE_TIMEOUT for rate-limit capacity."""
+
+
+def limits_for(model):
+    rpm, tpm = MODEL_LIMITS.get(model, DEFAULT_LIMITS)
+    return int(os.getenv("OPENAI_RPM", rpm)), int(os.getenv("OPENAI_TPM", tpm))
+
+
+def request_tokens(kwargs):
+    """Tokens a request counts against TPM: prompt estimate plus max_tokens, as OpenAI counts it."""
+    return prompt_tokens(kwargs.get("messages", [])) + (kwargs.get("max_tokens") or DEFAULT_MAX_TOKENS)
+
+
+class TokenBucket:
+    """Holds up to `capacity` units, refilled continuously at `per_minute`."""
+
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until `amount` is available (0 if it is now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount):
+        self.level -= min(amount, self.capacity)
+
+
+class _Lane:
+    """Waiting calls for one model: a FIFO per session, sessions served round-robin."""
+
+    def __init__(self, model):
+        rpm, tpm = limits_for(model)
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.queues = [OrderedDict() for _ in (INTERACTIVE, BULK)]  # priority -> session -> deque
+        self.depth = 0
+
+    def push(self, ticket):
+        self.queues[ticket.priority].setdefault(ticket.session, deque()).append(ticket)
+        self.depth += 1
+
+    def head(self):
+        for sessions in self.queues:
+            if sessions:
+                return next(iter(sessions.values()))[0]
+        return None
+
+    def pop(self, ticket):
+        sessions = self.queues[ticket.priority]
+        waiting = sessions.pop(ticket.session)
+        waiting.remove(ticket)
+        if waiting:
+            sessions[ticket.session] = waiting  # Re-inserted at the back: next session goes first
+        self.depth -= 1
+
+    def wait_time(self, tokens, now):
+        return max(self.requests.wait_time(1, now), self.tokens.wait_time(tokens, now))
+
+    def take(self, tokens):
+        self.requests.take(1)
+        self.tokens.take(tokens)
+
+
+class _Ticket:
+    def __init__(self, tokens, session, priority):
+        self.tokens = tokens
+        self.session = session
+        self.priority = priority
+
+
+class Scheduler:
+    def __init__(self, timeout=QUEUE_TIMEOUT):
+        self.timeout = timeout
+        self._lanes = {}
+        self._cond = threading.Condition()
+        self.admitted = 0
+        self.total_wait = 0.0
+
+    def _lane(self, model):
+        if model not in self._lanes:
+            self._lanes[model] = _Lane(model)
+        return self._lanes[model]
+
+    def acquire(self, model, tokens, session=None, priority=BULK):
+        """Block until the call may be sent; returns the seconds spent queued."""
+        ticket = _Ticket(tokens, session, priority)
+        started = time.monotonic()
+        deadline = started + self.timeout
+        with self._cond:
+            lane = self._lane(model)
+            lane.push(ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = None
+                    if lane.head() is ticket:
+                        wait = lane.wait_time(tokens, now)
+                        if wait == 0:
+                            lane.take(tokens)
+                            break
+                    if now >= deadline:
+                        raise QueueTimeout(f"Too many requests right now; gave up after {self.timeout:.0f}s in the queue.")
+                    # The head wakes when its bucket refills; everyone else when the head is admitted
+                    self._cond.wait(min(wait, deadline - now) if wait is not None else deadline - now)
+            finally:
+                lane.pop(ticket)
+                self._cond.notify_all()
+            waited = time.monotonic() - started
+            self.admitted += 1
+            self.total_wait += waited
+        return waited
+
+    def status(self, model, tokens=0):
+        """(calls queued for the model, rough seconds a new call of `tokens` would wait)."""
+        with self._cond:
+            lane = self._lane(model)
+            queued = [t for sessions in lane.queues for waiting in sessions.values() for t in waiting]
+            now = time.monotonic()
+            wait = max(
+                lane.requests.wait_time(len(queued) + 1, now),
+                lane.tokens.wait_time(sum(t.tokens for t in queued) + tokens, now),
+            )
+            return lane.depth, wait
+
+    def depths(self):
+        with self._cond:
+            return {model: lane.depth for model, lane in self._lanes.items()}
+
+
+_scheduler = Scheduler()
+
+
+def acquire(kwargs, labels=None):
+    """Wait for capacity for a chat completion request; returns seconds queued."""
+    if not ENABLED:
+        return 0.0
+    labels = labels or {}
+    return _scheduler.acquire(
+        kwargs.get("model"),
+        request_tokens(kwargs),
+        session=labels.get("session"),
+        priority=PRIORITIES.get(labels.get("call"), BULK),
+    )
+
+
+def status(model, tokens=0):
+    return _scheduler.status(model, tokens) if ENABLED else (0, 0.0)
+
+
+def depths():
+    return _scheduler.depths()
+
+
+def queue_notice(model, request=None):
+    """A short 'queued' message for the UI when a new call would have to wait, else None."""
+    depth, wait = status(model, request_tokens(request) if request else 0)
+    if not depth and wait < 1:
+        return None
+    ahead = f"{depth} request(s) ahead" if depth else "rate limit reached"
+    return f"⏳ Queued ({ahead}, about {max(wait, 1):.0f}s). The model's rate limit is shared by everyone using the app."
@@ -0,0 +1,256 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+import numpy as np
+
+# Near-duplicate cache in front of generation and validation. Exact-key caches miss
+# requests that only differ in form: a job description with an extra "Apply today!",
+# or other whitespace, casing and punctuation. Here the free text of a request is
+# canonicalized (stock boilerplate sentences dropped, then lowercase words only),
+# embedded locally (hashed character n-grams, no network) and compared by cosine
+# similarity with stored requests of the same scope. Everything else about the
+# request (role with casing and spacing ignored but seniority kept, technique,
+# model, settings) must match exactly.
+#
+# Similarity alone can't tell a harmless extra sentence from a meaningful edit: with
+# a long shared company blurb, "2 years" vs "10 years" or a swapped responsibility
+# still scores above 0.99. So the vector search only finds the candidate, and a hit
+# also needs the same set of canonical sentences (order and repeats ignored).
+#
+# Vectors live in a memory-mapped float32 array on disk; the payloads, scopes and
+# last-use times in SQLite next to it. Once full, the least recently used entry is
+# overwritten.
+
+ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "1") != "0"
+VALIDATE_ENABLED = os.getenv("SEMANTIC_VALIDATE_ENABLED", "0") == "1"  # Opt-in: a wrong verdict costs more
+DEFAULT_DIR = os.getenv("SEMANTIC_CACHE_DIR", os.path.join(".cache", "semantic"))
+MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", 100_000))
+DIM = 256
+NGRAMS = (3, 4, 5)
+SEARCH_BATCH = 16_384  # Rows compared per matrix product
+
+# Minimum cosine similarity to serve a stored answer, per kind of request
+THRESHOLDS = {
+    "generate": float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.95)),
+    "validate": float(os.getenv("SEMANTIC_VALIDATE_THRESHOLD", 0.97)),  # A wrong verdict costs more
+}
+
+# Sentences that say nothing about the job; dropped before embedding
+BOILERPLATE_PATTERNS = [
+    r"equal opportunity employer",
+    r"\bapply (now|today)\b",
+    r"\bbenefits include\b",
+    r"all qualified applicants",
+    r"reasonable accommodations?",
+    r"without regard to (race|age|gender)",
+]
+_BOILERPLATE_RE = re.compile("|".join(BOILERPLATE_PATTERNS), re.I)
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+
+
+def canonical_sentences(text):
+    """Sentences of `text` as lowercase words, without boilerplate sentences."""
+    sentences = []
+    for sentence in _SENTENCE_RE.split(text or ""):
+        words = _WORD_RE.findall(sentence.lower())
+        if words and not _BOILERPLATE_RE.search(sentence):
+            sentences.append(" ".join(words))
+    return sentences
+
+
+def fingerprint(text):
+    """Hash of the text's distinct canonical sentences; equal for reworded repeats only."""
+    canonical = "\n".join(sorted(set(canonical_sentences(text))))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+def embed(text, dim=DIM):
+    """Unit vector of the canonical text's hashed character n-grams (signed feature hashing)."""
+    padded = "^" + " ".join(canonical_sentences(text)) + "$"
+    grams = [padded[i:i + n] for n in NGRAMS for i in range(len(padded) - n + 1)]
+    vector = np.zeros(dim, dtype=np.float32)
+    if grams:
+        hashes = np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint32, count=len(grams))
+        signs = np.where(hashes & 0x80000000, -1.0, 1.0)
+        vector += np.bincount(hashes % dim, weights=signs, minlength=dim).astype(np.float32)
+    norm = np.linalg.norm(vector)
+    if norm == 0:
+        vector[0], norm = 1.0, 1.0  # Empty text: every empty text gets the same vector
+    return vector / norm
+
+
+def role_key(role):
+    """Role as it goes into a scope: "Senior  engineer" and "senior engineer" match, "intern" and "principal" don't."""
+    return " ".join((role or "").lower().split())
+
+
+def scope_id(*parts):
+    """Non-zero 63-bit id of the exact part of a request (0 marks an unused slot)."""
+    canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    value = int.from_bytes(hashlib.sha256(canonical.encode("utf-8")).digest()[:8], "big") >> 1
+    return value or 1
+
+
+class SemanticIndex:
+    """Fixed-capacity vector index: memory-mapped vectors and scopes, payloads in SQLite.
+
+    Several processes can share one directory; slot allocation goes through a SQLite
+    write transaction, and every hit is checked against the row's scope.
+    """
+
+    def __init__(self, path=DEFAULT_DIR, capacity=MAX_ENTRIES, dim=DIM):
+        self.path = path
+        self.capacity = capacity
+        self.dim = dim
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+        self._conn = sqlite3.connect(os.path.join(path, "entries.sqlite3"), timeout=5,
+                                     check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS entries (
+                slot INTEGER PRIMARY KEY,
+                scope INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                last_used REAL NOT NULL,
+                fingerprint TEXT NOT NULL DEFAULT ''
+            )"""
+        )
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(entries)")]
+        if "fingerprint" not in columns:  # Index made before fingerprints: its entries never match
+            self._conn.execute("ALTER TABLE entries ADD COLUMN fingerprint TEXT NOT NULL DEFAULT ''")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_used ON entries(last_used)")
+
+        vectors_path = os.path.join(path, f"vectors-{dim}.f32")
+        scopes_path = os.path.join(path, "scopes.i64")
+        fresh = not (os.path.exists(vectors_path) and os.path.getsize(vectors_path) == capacity * dim * 4
+                     and os.path.exists(scopes_path) and os.path.getsize(scopes_path) == capacity * 8)
+        if fresh:
+            self._conn.execute("DELETE FROM entries")  # Arrays missing or resized: start over
+        mode = "w+" if fresh else "r+"
+        self.vectors = np.memmap(vectors_path, dtype=np.float32, mode=mode, shape=(capacity, dim))
+        self.scopes = np.memmap(scopes_path, dtype=np.int64, mode=mode, shape=(capacity,))
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def _used(self):
+        """Slots [0, used) may hold entries."""
+        top = self._conn.execute("SELECT MAX(slot) FROM entries").fetchone()[0]
+        return 0 if top is None else top + 1
+
+    def search(self, scope, queries):
+        """Best (slot, similarity) in `scope` for each row of `queries`; slot -1 if none."""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        best_slots = np.full(len(queries), -1, dtype=np.int64)
+        best_sims = np.full(len(queries), -np.inf, dtype=np.float32)
+        with self._lock:
+            used = self._used()
+        for start in range(0, used, SEARCH_BATCH):
+            end = min(start + SEARCH_BATCH, used)
+            in_scope = np.flatnonzero(self.scopes[start:end] == scope)
+            if not len(in_scope):
+                continue
+            sims = self.vectors[start + in_scope] @ queries.T  # (rows in scope, queries)
+            top = sims.argmax(axis=0)
+            top_sims = sims[top, np.arange(len(queries))]
+            better = top_sims > best_sims
+            best_sims[better] = top_sims[better]
+            best_slots[better] = start + in_scope[top[better]]
+        return best_slots, best_sims
+
+    def get(self, scope, vector, threshold, fingerprint=None):
+        """Payload of the most similar entry in scope if it reaches `threshold`, else None.
+
+        With a `fingerprint`, the entry must also have been stored with the same one.
+        """
+        slots, sims = self.search(scope, vector)
+        slot, similarity = int(slots[0]), float(sims[0])
+        if slot >= 0 and similarity >= threshold:
+            with self._lock:
+                row = self._conn.execute("SELECT payload, fingerprint FROM entries WHERE slot = ? AND scope = ?",
+                                         (slot, scope)).fetchone()
+                if row is not None and (fingerprint is None or row[1] == fingerprint):
+                    self._conn.execute("UPDATE entries SET last_used = ? WHERE slot = ?", (time.time(), slot))
+                    self.hits += 1
+                    return json.loads(row[0])
+        self.misses += 1
+        return None
+
+    def add(self, scope, vector, payload, fingerprint=""):
+        """Store an entry, replacing an identical one in scope or the least recently used."""
+        slots, sims = self.search(scope, vector)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                same = None
+                if slots[0] >= 0 and sims[0] >= 0.999:
+                    same = self._conn.execute("SELECT fingerprint FROM entries WHERE slot = ?",
+                                              (int(slots[0]),)).fetchone()
+                if same is not None and same[0] == fingerprint:
+                    slot = int(slots[0])
+                else:
+                    slot = self._used()  # Slots fill in order and are only ever overwritten
+                    if slot >= self.capacity:
+                        slot = self._conn.execute(
+                            "SELECT slot FROM entries ORDER BY last_used LIMIT 1").fetchone()[0]
+                self.scopes[slot] = 0  # Readers skip the slot while its vector is rewritten
+                self.vectors[slot] = vector
+                self.scopes[slot] = scope
+                self._conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                                   (slot, scope, json.dumps(payload), time.time(), fingerprint))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return slot
+
+    def flush(self):
+        self.vectors.flush()
+        self.scopes.flush()
+
+    def stats(self):
+        return {"entries": len(self), "capacity": self.capacity, "hits": self.hits, "misses": self.misses}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Process-wide index, or None when disabled or the directory can't be used."""
+    global _index
+    if not ENABLED:
+        return None
+    with _index_lock:
+        if _index is None:
+            try:
+                _index = SemanticIndex()
+            except (OSError, ValueError, sqlite3.Error):
+                return None
+        return _index
+
+
+def lookup(kind, scope, text):
+    """Stored payload for a request of this kind whose text is close enough, else None."""
+    index = get_index()
+    if index is None:
+        return None
+    return index.get(scope_id(kind, scope), embed(text), THRESHOLDS[kind], fingerprint(text))
+
+
+def store(kind, scope, text, payload):
+    index = get_index()
+    if index is not None:
+        index.add(scope_id(kind, scope), embed(text), payload, fingerprint(text))
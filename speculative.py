@@ -0,0 +1,68 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Shared by every session in the process; the work is I/O bound (waiting on the API)
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="speculative")
+
+_DONE = object()
+
+
+def submit(fn, *args, **kwargs):
+    """Run a blocking call in the background and return its Future."""
+    return _executor.submit(fn, *args, **kwargs)
+
+
+class Prefetch:
+    """Start consuming an iterator on a background thread right away.
+
+    Items are buffered until the caller iterates, so a streaming completion can be
+    fired before validation finishes and replayed once it passes. cancel() stops
+    the background consumer and closes the underlying stream (dropping the HTTP
+    connection), so a rejected request stops generating tokens.
+
+    The iterator must not touch st.* APIs: it runs outside the script thread.
+    """
+
+    def __init__(self, iterable):
+        self._items = queue.Queue()
+        self._cancelled = threading.Event()
+        self._future = _executor.submit(self._pump, iter(iterable))
+
+    def _pump(self, iterator):
+        try:
+            for item in iterator:
+                if self._cancelled.is_set():
+                    break
+                self._items.put(item)
+        except BaseException as exc:  # Re-raised in the consumer thread
+            self._items.put(_Failure(exc))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+            self._items.put(_DONE)
+
+    def __iter__(self):
+        while True:
+            item = self._items.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.exc
+            yield item
+
+    def cancel(self):
+        """Discard the buffered output and stop the stream as soon as possible."""
+        self._cancelled.set()
+
+
+class _Failure:
+    def __init__(self, exc):
+        self.exc = exc
+
+
+def discard(pending):
+    """Cancel a Prefetch or Future whose result is no longer wanted."""
+    if pending is not None:
+        pending.cancel()
@@ -0,0 +1,72 @@
+import time
+from collections import deque
+
+import metrics
+from openai_client import chat_completion
+
+
+LATENCY_LOG_LIMIT = 50  # Recent streamed calls kept per session in st.session_state.latency_log
+
+
+def latency_log():
+    """Empty per-session log of recent {"call", "ttft", "total"} entries (oldest dropped first)."""
+    return deque(maxlen=LATENCY_LOG_LIMIT)
+
+
+def stream_completion(timings=None, tags=None, **kwargs):
+    """Yield text deltas from a streaming chat completion.
+
+    If `timings` (a dict) is given it is filled in as the stream progresses:
+    `ttft` is seconds until the first non-empty delta, `total` is seconds until
+    the stream finished. The finished call is recorded in metrics with `tags`.
+    """
+    started = time.perf_counter()
+    if timings is None:
+        timings = {}
+    timings["ttft"] = None
+    timings["total"] = None
+
+    # Ask for a final usage chunk so streamed calls report tokens too
+    kwargs.setdefault("stream_options", {"include_usage": True})
+    response = chat_completion(tags=tags, stream=True, **kwargs)
+    usage = None
+    error = None
+    try:
+        for chunk in response:
+            if getattr(chunk, "usage", None) is not None:
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            if timings["ttft"] is None:
+                timings["ttft"] = time.perf_counter() - started
+            yield delta
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        timings["total"] = time.perf_counter() - started
+        close = getattr(response, "close", None)
+        if close is not None:
+            close()
+        if isinstance(error, GeneratorExit):
+            outcome = "cancelled"
+        else:
+            outcome = metrics.outcome_of(error)
+        metrics.record(
+            tags, kwargs.get("model"), outcome, timings["total"], ttfb=timings["ttft"],
+            prompt_tokens=getattr(usage, "prompt_tokens", 0),
+            completion_tokens=getattr(usage, "completion_tokens", 0),
+        )
+
+
+def format_timings(timings):
+    """Short caption like '⏱️ First token 0.42s · total 3.10s'."""
+    if not timings or timings.get("total") is None:
+        return ""
+    ttft = timings.get("ttft")
+    if ttft is None:
+        return f"⏱️ Total {timings['total']:.2f}s"  # Not streamed, or nothing came back
+    return f"⏱️ First token {ttft:.2f}s · total {timings['total']:.2f}s"
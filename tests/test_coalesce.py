@@ -0,0 +1,77 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from coalesce import SingleFlight
+
+
+def leader_in_flight(flight, key, release, result="answer", error=None):
+    """Start a leader call for `key` that blocks until `release` is set; returns its future."""
+    started = threading.Event()
+
+    def fn():
+        started.set()
+        release.wait(5)
+        if error is not None:
+            raise error
+        return result
+
+    future = ThreadPoolExecutor(1).submit(flight.call, key, fn)
+    started.wait(5)
+    return future
+
+
+def release_soon(release):
+    time.sleep(0.1)  # Let the followers find the leader's call before it finishes
+    release.set()
+
+
+def test_followers_share_the_leaders_answer():
+    flight, release = SingleFlight(max_wait=5), threading.Event()
+    leader = leader_in_flight(flight, "k", release)
+    with ThreadPoolExecutor(4) as pool:
+        followers = [pool.submit(flight.call, "k", lambda: pytest.fail("follower called the API")) for _ in range(4)]
+        release_soon(release)
+        assert [f.result(5) for f in followers] == [("answer", True)] * 4
+    assert leader.result(5) == ("answer", False)
+    assert flight.shared == 4 and flight.in_flight() == 0
+
+
+def test_followers_get_the_leaders_exception():
+    flight, release = SingleFlight(max_wait=5), threading.Event()
+    leader = leader_in_flight(flight, "k", release, error=RuntimeError("rate limited"))
+    with ThreadPoolExecutor(1) as pool:
+        follower = pool.submit(flight.call, "k", lambda: "own")
+        release_soon(release)
+        with pytest.raises(RuntimeError, match="rate limited"):
+            follower.result(5)
+    with pytest.raises(RuntimeError):
+        leader.result(5)
+    assert flight.in_flight() == 0
+
+
+@pytest.mark.parametrize("max_wait, expected", [
+    (0.05, ("own", False)),  # Leader too slow: the follower calls on its own
+    (5, ("answer", True)),
+])
+def test_follower_timeout(max_wait, expected):
+    flight, release = SingleFlight(max_wait=max_wait), threading.Event()
+    leader = leader_in_flight(flight, "k", release)
+    with ThreadPoolExecutor(1) as pool:
+        follower = pool.submit(flight.call, "k", lambda: "own")
+        if max_wait == 5:
+            release_soon(release)
+        assert follower.result(5) == expected
+    release.set()
+    assert leader.result(5) == ("answer", False)
+
+
+def test_other_keys_and_later_calls_are_not_shared():
+    flight, release = SingleFlight(max_wait=5), threading.Event()
+    leader = leader_in_flight(flight, "k", release)
+    assert flight.call("other", lambda: "other answer") == ("other answer", False)
+    release.set()
+    leader.result(5)
+    assert flight.call("k", lambda: "fresh") == ("fresh", False)  # Nothing in flight any more
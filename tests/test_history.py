@@ -0,0 +1,88 @@
+import pytest
+
+from history import HistoryManager, estimate_tokens
+
+SYSTEM = "You are an interviewer."
+
+
+def conversation(count, length=20):
+    """Interview messages: the interviewer's opening, then candidate/interviewer turns."""
+    return [{"role": "assistant" if i % 2 == 0 else "user", "content": f"message {i} " + "x" * length}
+            for i in range(count)]
+
+
+class Summarizer:
+    def __init__(self):
+        self.prompts = []
+
+    def __call__(self, prompt):
+        self.prompts.append(prompt)
+        return f"notes {len(self.prompts)}"
+
+
+def grow(count, **options):
+    """Build the prompt after every message, as the app does each turn."""
+    summarize = Summarizer()
+    history = HistoryManager(summarize, **options)
+    messages = conversation(count)
+    for end in range(1, count + 1):
+        api_messages = history.build(SYSTEM, messages[:end])
+    return history, summarize, api_messages, messages
+
+
+@pytest.mark.parametrize("count, summarized_upto, refreshes", [
+    (1, 0, 0),
+    (9, 0, 0),    # Opening + 4 exchanges fit the verbatim window
+    (12, 0, 0),   # Slides only once a whole stride (2 exchanges) has overflowed
+    (13, 4, 1),
+    (16, 4, 1),
+    (17, 8, 2),
+    (41, 32, 8),
+])
+def test_window_slides_in_strides(count, summarized_upto, refreshes):
+    history, summarize, api_messages, messages = grow(count)
+    assert history.summarized_upto == summarized_upto
+    assert history.refreshes == len(summarize.prompts) == refreshes
+    assert api_messages[0] == {"role": "system", "content": SYSTEM}
+    assert api_messages[-(count - summarized_upto):] == messages[summarized_upto:]
+    assert (api_messages[1]["role"] == "system" and "notes" in api_messages[1]["content"]) is bool(refreshes)
+
+
+def test_summary_is_updated_incrementally():
+    history, summarize, _, messages = grow(17)
+    first, second = summarize.prompts
+    assert "(none yet)" in first and messages[3]["content"] in first
+    assert "notes 1" in second  # The previous notes, not the old turns again
+    assert messages[3]["content"] not in second and messages[7]["content"] in second
+    assert history.summary == "notes 2"
+
+
+@pytest.mark.parametrize("keep_exchanges, stride, count, summarized_upto", [
+    (1, 1, 5, 2),
+    (2, 1, 9, 4),
+    (4, 4, 16, 0),
+    (4, 4, 17, 8),
+])
+def test_window_options(keep_exchanges, stride, count, summarized_upto):
+    history, _, _, _ = grow(count, keep_exchanges=keep_exchanges, stride=stride)
+    assert history.summarized_upto == summarized_upto
+
+
+def test_long_turns_shrink_the_window_to_fit_the_budget():
+    summarize = Summarizer()
+    history = HistoryManager(summarize, token_budget=500)
+    messages = conversation(7, length=600)  # ~150 tokens each: only a few fit
+    api_messages = history.build(SYSTEM, messages)
+    recent = messages[history.summarized_upto:]
+    assert history.summarized_upto > 0
+    assert estimate_tokens(SYSTEM) + estimate_tokens(history.summary) + \
+        sum(estimate_tokens(m["content"]) + 4 for m in recent) <= 500
+    assert api_messages[-1] == messages[-1]
+
+
+def test_latest_message_is_always_sent_even_over_budget():
+    history = HistoryManager(Summarizer(), token_budget=10)
+    messages = conversation(3, length=2000)
+    api_messages = history.build(SYSTEM, messages)
+    assert history.summarized_upto == 2
+    assert api_messages[-1] == messages[-1]
@@ -0,0 +1,49 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import jd_digest
+import response_cache
+
+JD = "We are hiring a backend engineer to design and maintain payment services. " * 30
+DIGEST = {"seniority": "Senior", "responsibilities": ["Payment services"], "required_skills": ["Python"],
+          "tech_stack": ["Postgres"]}
+
+
+@pytest.fixture
+def calls(monkeypatch, tmp_path):
+    made = []
+
+    def chat_completion(tags=None, **request):
+        made.append(request)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(DIGEST)))])
+
+    monkeypatch.setattr(jd_digest, "chat_completion", chat_completion)
+    monkeypatch.setattr(response_cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(jd_digest, "_memory", type(jd_digest._memory)())
+    return made
+
+
+@pytest.mark.parametrize("policy", [response_cache.OFF, response_cache.DETERMINISTIC, response_cache.VARIANTS])
+def test_digest_is_made_once_whatever_the_policy(calls, policy):
+    first = jd_digest.for_prompt(JD, policy=policy)
+    second = jd_digest.for_prompt(" ".join(JD.split()), policy=policy)
+    assert first == second
+    assert first.startswith("Digest of the job description:")
+    assert len(calls) == 1
+
+
+def test_off_policy_writes_nothing_to_disk(calls, tmp_path):
+    jd_digest.for_prompt(JD, policy=response_cache.OFF)
+    assert not list(tmp_path.rglob("*.json"))
+
+
+@pytest.mark.parametrize("text, prep_type, expected", [
+    (JD, "Technical Questions", True),
+    (JD, "Analyze a Job Description", False),
+    ("Python and SQL", "Technical Questions", False),
+    ("", None, False),
+])
+def test_needs_digest(text, prep_type, expected):
+    assert jd_digest.needs_digest(text, prep_type) is expected
@@ -0,0 +1,59 @@
+import pytest
+
+from job_titles import JobTitleIndex, get_index, normalize
+
+TITLES = ["Software Engineer", "Data Scientist", "Registered Nurse", "Baker", "Tutor", "Product Manager"]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return JobTitleIndex(TITLES)
+
+
+@pytest.mark.parametrize("title, expected", [
+    ("Software Engineer", "software engineer"),
+    ("  software   ENGINEER ", "software engineer"),
+    ("Sr. Software Engineer", "software engineer"),
+    ("Software Engineer II", "software engineer"),
+    ("Software Engineers", "software engineer"),
+    ("SWE", "software engineer"),
+    ("Sr PM", "product manager"),
+    ("Head of Engineering", "head of engineering"),
+    ("Front-End Dev", "frontend developer"),
+    ("", ""),
+])
+def test_normalize(title, expected):
+    assert normalize(title) == expected
+
+
+@pytest.mark.parametrize("role, expected", [
+    ("Software Engineer", "software engineer"),
+    ("senior data scientists", "data scientist"),
+    ("RN", "registered nurse"),
+    ("Sofware Engineer", "software engineer"),  # One typo in a long title
+    ("Data Scientst", "data scientist"),
+    # Keys of MIN_FUZZY_LENGTH characters or fewer only match exactly
+    ("Faker", None),
+    ("Raker", None),
+    ("Tumor", None),
+    ("Baker", "baker"),
+    ("Dragon Trainer", None),
+    ("", None),
+])
+def test_lookup(index, role, expected):
+    assert index.lookup(role) == expected
+
+
+@pytest.mark.parametrize("role", ["Sofware Engineer", "Data Scientst"])
+def test_lookup_exact_only(index, role):
+    assert index.lookup(role, fuzzy=False) is None
+
+
+def test_suggest(index):
+    assert index.suggest("soft") == ["software engineer"]
+    assert index.suggest("Faker", limit=1) == ["baker"]
+    assert index.suggest("") == []
+
+
+def test_bundled_index_loads():
+    assert get_index().lookup("Software Engineer", fuzzy=False) == "software engineer"
@@ -0,0 +1,154 @@
+import json
+
+import pytest
+
+from json_stream import PrepParser, finalize
+
+BASIC = {
+    "role": "Software Engineer",
+    "prep_type": "Technical Questions",
+    "questions": [
+        {"question": "How does a hash map work?", "hint": "data structures"},
+        {"question": "Explain \"eventual consistency\" {with braces} and ] brackets", "hint": "distributed systems"},
+        {"question": "What is a race condition?", "hint": "concurrency"},
+    ],
+    "quick_tips": ["Think aloud", "Ask clarifying questions"],
+}
+
+DETAILED = {
+    "role": "Data Engineer",
+    "prep_type": "Technical Questions",
+    "difficulty": "Hard",
+    "questions": [
+        {
+            "id": n,
+            "question": f"Question {n}",
+            "what_is_tested": "pipelines",
+            "model_answer": "Partition by date, e.g. {\"day\": [1, 2]}",
+            "red_flags": "no monitoring",
+            "follow_up_questions": [f"Follow-up {n}a", f"Follow-up {n}b"],
+        }
+        for n in (1, 2, 3)
+    ],
+    "preparation_strategy": "Review streaming and batch systems",
+    "estimated_prep_time": "1-2 weeks",
+    "resources": ["Designing Data-Intensive Applications"],
+}
+
+REQUEST = {"model": "gpt-4o", "messages": [{"role": "system", "content": "sys"}, {"role": "user", "content": "go"}],
+           "stream": True, "temperature": 0.7}
+
+
+def feed_chunks(parser, text, size):
+    completed = []
+    for start in range(0, len(text), size):
+        completed.extend(parser.feed(text[start:start + size]))
+    return completed
+
+
+@pytest.mark.parametrize("technique, document", [("JSON Basic", BASIC), ("JSON Detailed", DETAILED)])
+@pytest.mark.parametrize("size", [1, 7, 10_000])
+def test_complete_answer(technique, document, size):
+    parser = PrepParser(technique)
+    completed = feed_chunks(parser, json.dumps(document, indent=2), size)
+    assert parser.closed
+    assert completed == document["questions"]
+    assert parser.problems() == []
+    assert parser.document() == document
+
+
+@pytest.mark.parametrize("wrapped", [
+    "```json\n{}\n```",
+    "```\n{}\n```",
+    "Here is your preparation:\n\n{}\n\nGood luck!",
+])
+def test_fenced_or_wrapped_answer(wrapped):
+    parser = PrepParser("JSON Basic")
+    parser.feed(wrapped.replace("{}", json.dumps(BASIC)))
+    assert parser.closed
+    assert parser.problems() == []
+    assert parser.document() == BASIC
+
+
+def test_questions_arrive_one_by_one():
+    parser = PrepParser("JSON Basic")
+    text = json.dumps(BASIC)
+    first_end = text.index("}") + 1
+    assert parser.feed(text[:first_end - 1]) == []
+    assert parser.feed(text[first_end - 1:first_end]) == [BASIC["questions"][0]]
+
+
+def test_truncated_answer():
+    parser = PrepParser("JSON Basic")
+    text = json.dumps(BASIC)
+    parser.feed(text[:text.index("What is a race")])
+    assert not parser.closed
+    assert len(parser.questions) == 2
+    assert parser.fields == {"role": "Software Engineer", "prep_type": "Technical Questions"}
+    assert parser.problems() == ["missing quick_tips", "1 question(s) missing"]
+
+
+def test_malformed_question_is_rejected():
+    document = dict(BASIC, questions=[{"question": "No hint"}] + BASIC["questions"])
+    parser = PrepParser("JSON Basic")
+    parser.feed(json.dumps(document))
+    assert parser.rejected == 1
+    assert parser.questions == BASIC["questions"]
+    assert parser.problems() == []
+
+
+def test_nested_values_and_ids():
+    document = json.loads(json.dumps(DETAILED))
+    for item in document["questions"]:
+        item["id"] = 99  # Renumbered in order
+    parser = PrepParser("JSON Detailed")
+    parser.feed(json.dumps(document))
+    assert [item["id"] for item in parser.document()["questions"]] == [1, 2, 3]
+    assert parser.document()["questions"][0]["follow_up_questions"] == ["Follow-up 1a", "Follow-up 1b"]
+
+
+def test_repair_request_continues_from_the_partial_answer():
+    parser = PrepParser("JSON Basic")
+    partial = json.dumps(BASIC)[:200]
+    parser.feed(partial)
+    repair = parser.repair_request(REQUEST)
+    assert "stream" not in repair
+    assert repair["messages"][:2] == REQUEST["messages"]
+    assert repair["messages"][2] == {"role": "assistant", "content": partial}
+    assert repair["messages"][3]["role"] == "user"
+    assert "quick_tips" in repair["messages"][3]["content"]
+    assert REQUEST["messages"] == [{"role": "system", "content": "sys"}, {"role": "user", "content": "go"}]
+
+
+def test_repair_request_without_partial_answer():
+    parser = PrepParser("JSON Basic")
+    repair = parser.repair_request(REQUEST)
+    assert [m["role"] for m in repair["messages"]] == ["system", "user", "user"]
+
+
+def test_no_repair_when_complete():
+    parser = PrepParser("JSON Basic")
+    parser.feed(json.dumps(BASIC))
+    assert parser.repair_request(REQUEST) is None
+
+
+def test_finalize_merges_the_repair():
+    parser = PrepParser("JSON Basic")
+    text = json.dumps(BASIC)
+    parser.feed(text[:text.index("What is a race")])
+    patch = {"questions": [BASIC["questions"][2]], "quick_tips": BASIC["quick_tips"]}
+    document, problems = finalize(parser, REQUEST, lambda request: json.dumps(patch))
+    assert problems == []
+    assert document == BASIC
+
+
+def test_finalize_keeps_salvaged_parts_when_repair_fails():
+    def fail(request):
+        raise RuntimeError("timeout")
+
+    parser = PrepParser("JSON Basic")
+    text = json.dumps(BASIC)
+    parser.feed(text[:text.index("What is a race")])
+    document, problems = finalize(parser, REQUEST, fail)
+    assert len(document["questions"]) == 2
+    assert problems == ["missing quick_tips", "1 question(s) missing"]
@@ -0,0 +1,152 @@
+import time
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+import openai_client
+from openai_client import CircuitBreaker, CircuitOpenError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = Clock()
+    monkeypatch.setattr(openai_client, "time", SimpleNamespace(
+        monotonic=fake.monotonic, sleep=fake.sleep, time=time.time, perf_counter=time.perf_counter))
+    return fake
+
+
+def status_error(code, headers=None):
+    response = httpx.Response(code, headers=headers, request=httpx.Request("POST", "https://api.openai.com/v1"))
+    return openai.APIStatusError(f"status {code}", response=response, body=None)
+
+
+def connection_error():
+    return openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com/v1"))
+
+
+# --- Circuit breaker state machine ---
+
+def test_breaker_opens_after_threshold_and_fails_fast(clock):
+    breaker = CircuitBreaker(threshold=3, cooldown=30)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+@pytest.mark.parametrize("trial_succeeds, state_after", [(True, "closed"), (False, "open")])
+def test_half_open_lets_one_trial_through(clock, trial_succeeds, state_after):
+    breaker = CircuitBreaker(threshold=1, cooldown=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.state == "half-open"
+    breaker.before_call()  # The trial
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # Everyone else still fails fast while it runs
+    if trial_succeeds:
+        breaker.record_success()
+    else:
+        breaker.record_failure()
+    assert breaker.state == state_after
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(threshold=2, cooldown=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+# --- Retries ---
+
+@pytest.fixture
+def api(monkeypatch, clock):
+    """Fake client whose create() raises or returns the queued outcomes in order."""
+    outcomes = []
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(openai_client, "get_client", lambda: client)
+    monkeypatch.setattr(openai_client, "breaker", CircuitBreaker(threshold=3, cooldown=30))
+    monkeypatch.setattr(openai_client, "MAX_RETRIES", 3)
+    return SimpleNamespace(outcomes=outcomes, calls=calls)
+
+
+@pytest.mark.parametrize("errors", [
+    [status_error(500)],
+    [status_error(429), status_error(503)],
+    [connection_error(), status_error(502), status_error(408)],
+])
+def test_retryable_errors_are_retried(api, clock, errors):
+    api.outcomes.extend(errors + ["response"])
+    assert openai_client._create_with_retries(model="m") == "response"
+    assert len(api.calls) == len(errors) + 1
+    assert len(clock.slept) == len(errors)
+
+
+@pytest.mark.parametrize("code", [400, 401, 404])
+def test_client_errors_are_not_retried(api, clock, code):
+    api.outcomes.append(status_error(code))
+    with pytest.raises(openai.APIStatusError):
+        openai_client._create_with_retries(model="m")
+    assert len(api.calls) == 1 and not clock.slept
+    assert openai_client.breaker.state == "closed"
+
+
+def test_gives_up_after_max_retries(api, clock):
+    api.outcomes.extend([status_error(429)] * 4)
+    with pytest.raises(openai.APIStatusError):
+        openai_client._create_with_retries(model="m")
+    assert len(api.calls) == 4
+    assert openai_client.breaker.state == "closed"  # Rate limits mean the API is up
+
+
+def test_upstream_failures_open_the_breaker(api, clock):
+    api.outcomes.extend([status_error(500)] * 3)
+    with pytest.raises(CircuitOpenError):
+        openai_client._create_with_retries(model="m")
+    assert len(api.calls) == 3  # The fourth attempt failed fast
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({"retry-after": "7"}, 7.0),
+    ({"retry-after-ms": "1500"}, 1.5),
+    ({"retry-after": "3600"}, openai_client.BACKOFF_MAX),
+])
+def test_retry_after_is_honored(api, clock, headers, expected):
+    api.outcomes.extend([status_error(429, headers), "response"])
+    openai_client._create_with_retries(model="m")
+    assert clock.slept == [expected]
+
+
+@pytest.mark.parametrize("attempt", range(8))
+def test_backoff_is_jittered_and_capped(attempt):
+    limit = min(openai_client.BACKOFF_MAX, openai_client.BACKOFF_BASE * 2 ** attempt)
+    assert all(0 <= openai_client.backoff_delay(attempt) <= limit for _ in range(50))
@@ -0,0 +1,27 @@
+import pytest
+
+from history import estimate_tokens
+from prompts import PROMPT_TECHNIQUES, SYSTEM_PROMPT_TOKENS, TEMPLATES, content_tokens, prompt_tokens, render
+
+
+@pytest.mark.parametrize("technique", list(PROMPT_TECHNIQUES))
+def test_system_prompts_use_the_memo(technique):
+    text = PROMPT_TECHNIQUES[technique]["system_prompt"]
+    assert content_tokens(text) == SYSTEM_PROMPT_TOKENS[technique] == estimate_tokens(text)
+
+
+@pytest.mark.parametrize("template, values", [
+    ("generate", {"role": "Nurse", "prep_type": "Technical Questions", "difficulty": "Easy", "user_input": ""}),
+    ("interview_opening", {"role": "Nurse", "difficulty": "Hard", "job_description": "ICU, night shifts " * 50}),
+    ("jd_digest", {"job_description": "Python and SQL " * 200}),
+])
+def test_template_estimate_is_close_to_a_full_count(template, values):
+    text = render(template, **values)
+    assert abs(TEMPLATES[template].estimate_tokens(text) - estimate_tokens(text)) <= 1
+    assert abs(content_tokens(text) - estimate_tokens(text)) <= 1
+
+
+def test_prompt_tokens_counts_message_overhead():
+    messages = [{"role": "system", "content": PROMPT_TECHNIQUES["Zero-Shot"]["system_prompt"]},
+                {"role": "user", "content": "Hello"}, {"role": "assistant", "content": None}]
+    assert prompt_tokens(messages) == SYSTEM_PROMPT_TOKENS["Zero-Shot"] + estimate_tokens("Hello") + estimate_tokens("") + 12
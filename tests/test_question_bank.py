@@ -0,0 +1,30 @@
+import pytest
+
+from question_bank import QuestionBank
+
+DEFAULTS = dict(temperature=0.7, max_tokens=1000, top_p=1.0, frequency_penalty=0.0, presence_penalty=0.0)
+ENTRY = ("Nurse", "Easy", "Technical Questions", "Zero-Shot", "gpt-4o-mini")
+
+
+@pytest.fixture
+def bank(tmp_path):
+    bank = QuestionBank(str(tmp_path / "bank.sqlite3"))
+    bank.put(*ENTRY, DEFAULTS, "stored answer")
+    return bank
+
+
+@pytest.mark.parametrize("changes, served", [
+    ({}, True),
+    ({"temperature": 0.7000000000000001}, True),  # Slider rounding
+    ({"temperature": 0.0}, False),
+    ({"max_tokens": 100}, False),
+    ({"top_p": 0.5}, False),
+    ({"presence_penalty": 0.5}, False),
+])
+def test_served_only_with_the_same_settings(bank, changes, served):
+    request = dict(DEFAULTS, messages=[], model="gpt-4o-mini", **changes)  # Other request keys don't matter
+    assert (bank.get(*ENTRY, request) == "stored answer") is served
+
+
+def test_other_role_misses(bank):
+    assert bank.get("Baker", *ENTRY[1:], DEFAULTS) is None
@@ -0,0 +1,72 @@
+import threading
+import time
+
+import pytest
+
+import scheduler
+from scheduler import BULK, INTERACTIVE, QueueTimeout, Scheduler
+
+
+@pytest.fixture
+def blocked(monkeypatch):
+    """A scheduler whose lane has no request capacity for ~0.2s, then admits one call per 10ms."""
+    monkeypatch.setenv("OPENAI_RPM", "6000")
+    monkeypatch.setenv("OPENAI_TPM", "1000000")
+    sched = Scheduler(timeout=5)
+    sched._lane("test-model").requests.level = -20
+    return sched
+
+
+def admission_order(sched, calls):
+    """Queue `calls` ([(name, session, priority)]) in order; names in the order they were admitted."""
+    admitted, threads = [], []
+    lane = sched._lane("test-model")
+    for name, session, priority in calls:
+        depth = lane.depth
+
+        def run(name=name, session=session, priority=priority):
+            sched.acquire("test-model", 1, session=session, priority=priority)
+            admitted.append(name)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        threads.append(thread)
+        while lane.depth == depth:  # Wait until it is queued, so the queue order is known
+            time.sleep(0.001)
+    for thread in threads:
+        thread.join(5)
+    return admitted
+
+
+@pytest.mark.parametrize("calls, expected", [
+    # Interview turns overtake bulk generation already waiting
+    ([("gen1", "a", BULK), ("gen2", "b", BULK), ("turn", "c", INTERACTIVE)], ["turn", "gen1", "gen2"]),
+    # Within a priority, sessions take turns instead of one session draining its queue
+    ([("a1", "a", BULK), ("a2", "a", BULK), ("a3", "a", BULK), ("b1", "b", BULK)], ["a1", "b1", "a2", "a3"]),
+    # One session's calls stay in order
+    ([("a1", "a", INTERACTIVE), ("a2", "a", INTERACTIVE)], ["a1", "a2"]),
+])
+def test_admission_order(blocked, calls, expected):
+    assert admission_order(blocked, calls) == expected
+    assert blocked.depths() == {"test-model": 0}
+
+
+def test_gives_up_after_the_queue_timeout(blocked):
+    blocked.timeout = 0.05
+    with pytest.raises(QueueTimeout):
+        blocked.acquire("test-model", 1)
+    assert blocked.depths() == {"test-model": 0}  # The timed-out call left the queue
+
+
+def test_status_reports_the_wait_for_a_new_call(blocked):
+    depth, wait = blocked.status("test-model")
+    assert depth == 0 and 0.15 < wait < 0.25
+
+
+@pytest.mark.parametrize("request_kwargs, expected", [
+    ({"messages": [{"role": "user", "content": "x" * 400}], "max_tokens": 100}, 101 + 4 + 100),
+    ({"messages": [{"role": "user", "content": "x" * 400}]}, 101 + 4 + scheduler.DEFAULT_MAX_TOKENS),
+    ({"messages": [], "max_tokens": 50}, 50),
+])
+def test_request_tokens(request_kwargs, expected):
+    assert scheduler.request_tokens(request_kwargs) == expected
@@ -0,0 +1,64 @@
+import pytest
+
+from semantic_cache import THRESHOLDS, SemanticIndex, embed, fingerprint, role_key, scope_id
+
+
+@pytest.mark.parametrize("first, second, same", [
+    ("Software Engineer", "  software   ENGINEER ", True),
+    ("Intern Software Engineer", "Principal Software Engineer", False),
+    ("Senior Data Scientist", "Data Scientist", False),
+    ("", "   ", True),
+])
+def test_role_key(first, second, same):
+    assert (role_key(first) == role_key(second)) is same
+
+
+def test_seniority_gets_its_own_scope(tmp_path):
+    index = SemanticIndex(str(tmp_path), capacity=8)
+    text = "Build data pipelines in Python and SQL for the analytics team."
+    index.add(scope_id("generate", (role_key("Intern Data Engineer"),)), embed(text), "intern answer")
+    threshold = THRESHOLDS["generate"]
+    assert index.get(scope_id("generate", (role_key("intern  data engineer"),)), embed(text.upper()), threshold) == "intern answer"
+    assert index.get(scope_id("generate", (role_key("Principal Data Engineer"),)), embed(text), threshold) is None
+
+
+COMPANY = ("Acme Corp is a fast-growing fintech company headquartered in Austin with offices in London and "
+           "Singapore. We value ownership, curiosity and collaboration. Our mission is to make payments simple for "
+           "small businesses everywhere. Since 2015 we have grown to 400 people and serve customers in 30 countries. ") * 3
+ML = "In this role you will build machine learning pipelines and train ranking models in Python and PyTorch."
+AP = "In this role you will process vendor invoices and reconcile accounts payable ledgers in NetSuite."
+QUESTION = "I have 2 years of experience and want questions on SQL joins"
+
+
+@pytest.mark.parametrize("stored, asked", [
+    (QUESTION, QUESTION.upper()),
+    (QUESTION, "  " + QUESTION.replace(" ", "  ") + "\n"),
+    (QUESTION, QUESTION + "."),
+    (COMPANY + ML, COMPANY + ML + " Apply today! We are an equal opportunity employer."),
+    (COMPANY + ML, ML + " " + COMPANY),  # Sections in another order
+])
+def test_reworded_repeat_hits(tmp_path, stored, asked):
+    index = SemanticIndex(str(tmp_path), capacity=8)
+    index.add(1, embed(stored), "answer", fingerprint(stored))
+    assert index.get(1, embed(asked), THRESHOLDS["generate"], fingerprint(asked)) == "answer"
+
+
+@pytest.mark.parametrize("stored, asked", [
+    (QUESTION, QUESTION.replace("2 years", "10 years")),
+    (QUESTION, QUESTION.replace("joins", "indexes")),
+    (COMPANY + ML, COMPANY + AP),
+    (COMPANY + ML, COMPANY + ML.replace("PyTorch", "TensorFlow")),
+    ("Senior backend role. " + COMPANY + ML, "Junior backend role. " + COMPANY + ML),
+    (COMPANY + ML, COMPANY + ML + " Visit our careers page to learn more."),  # Unknown text is never assumed harmless
+])
+def test_changed_content_misses(tmp_path, stored, asked):
+    index = SemanticIndex(str(tmp_path), capacity=8)
+    index.add(1, embed(stored), "answer", fingerprint(stored))
+    assert index.get(1, embed(asked), THRESHOLDS["generate"], fingerprint(asked)) is None
+
+
+def test_fingerprinted_entry_is_not_replaced_by_a_different_text(tmp_path):
+    index = SemanticIndex(str(tmp_path), capacity=8)
+    first = index.add(1, embed(COMPANY + ML), "ml", fingerprint(COMPANY + ML))
+    second = index.add(1, embed(COMPANY + ML + " TensorFlow."), "tf", fingerprint(COMPANY + ML + " TensorFlow."))
+    assert first != second and len(index) == 2
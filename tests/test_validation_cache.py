@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+
+import pytest
+
+import validation_cache
+from validation_cache import ValidationCache
+
+VERDICT = (True, "ok", True, "ok")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(validation_cache, "time", SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def entry_size(role):
+    cache_key = validation_cache.make_key(role, "")
+    return len(cache_key) + len(validation_cache.json.dumps(list(VERDICT)))
+
+
+@pytest.mark.parametrize("hit_from_memory", [True, False])
+def test_recently_hit_verdicts_survive_eviction(tmp_path, clock, hit_from_memory):
+    cache = ValidationCache(str(tmp_path / "v.sqlite3"), max_bytes=entry_size("nurse") * 2 + 1)
+    cache.put("Nurse", "", VERDICT)
+    clock[0] += 1
+    cache.put("Baker", "", VERDICT)
+    clock[0] += 1
+    if not hit_from_memory:
+        cache._memory.clear()
+    assert cache.get("Nurse", "") == VERDICT
+    clock[0] += 1
+    cache.put("Tutor", "", VERDICT)  # Over budget: the least recently used entry goes
+
+    cache._memory.clear()
+    assert cache.get("Nurse", "") == VERDICT
+    assert cache.get("Baker", "") is None
+
+
+def test_expired_verdicts_miss(tmp_path, clock):
+    cache = ValidationCache(str(tmp_path / "v.sqlite3"), ttl=60)
+    cache.put("Nurse", "", VERDICT)
+    clock[0] += 61
+    assert cache.get("Nurse", "") is None
+    assert cache.stats()["total_misses"] == 1
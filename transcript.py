@@ -0,0 +1,54 @@
+import streamlit as st
+
+# Windowed rendering of the mock interview transcript. Only the most recent
+# messages are drawn on every rerun; older ones sit in a collapsed, paginated
+# expander so render time stays flat however long the interview runs.
+
+RECENT_MESSAGES = 10  # Always drawn (5 exchanges)
+PAGE_SIZE = 20        # Older messages drawn per page
+
+AVATARS = {"assistant": "👔", "user": "👤"}
+
+# st.fragment reruns only its own function when a widget inside it changes
+# (Streamlit >= 1.37; experimental_fragment since 1.33). Older versions just
+# render normally.
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda fn: fn)
+
+
+def render_message(message):
+    with st.chat_message(message["role"], avatar=AVATARS.get(message["role"])):
+        st.markdown(message["content"])
+
+
+def page_count(older):
+    return (older + PAGE_SIZE - 1) // PAGE_SIZE
+
+
+@_fragment
+def _render_older(older, load):
+    """Collapsed, paginated history; page 1 holds the messages just before the recent window."""
+    pages = page_count(older)
+    with st.expander(f"🕘 Earlier messages ({older})", expanded=False):
+        page = 1
+        if pages > 1:
+            page = st.number_input("Page (1 = most recent)", min_value=1, max_value=pages, value=1,
+                                   key="transcript_page")
+        end = older - (page - 1) * PAGE_SIZE
+        for message in load(max(0, end - PAGE_SIZE), end):
+            render_message(message)
+
+
+def render_transcript(messages, offset=0, load=None):
+    """Draw the recent window, with everything older collapsed above it.
+
+    `offset` earlier messages are no longer held in `messages`; `load(start, end)`
+    returns messages by absolute position (see chatbot.older_messages).
+    """
+    if load is None:
+        load = lambda start, end: messages[start:end]  # noqa: E731
+    total = offset + len(messages)
+    older = max(0, total - RECENT_MESSAGES)
+    if older:
+        _render_older(older, load)
+    for message in load(older, total):
+        render_message(message)
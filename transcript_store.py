@@ -0,0 +1,207 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+# Durable, append-only store for mock interview transcripts. Every turn is written as
+# it happens, so a browser refresh, server restart or worker recycle can resume the
+# interview (the app keeps the session id in the URL) without paying for the opening
+# again. A resumed session only loads the rolling summary and the turns after it;
+# older turns are read page by page when the transcript view asks for them.
+
+ENABLED = os.getenv("TRANSCRIPTS_ENABLED", "1") != "0"
+DEFAULT_PATH = os.getenv("TRANSCRIPT_DB_PATH", os.path.join(".cache", "transcripts.sqlite3"))
+RETENTION_SECONDS = int(os.getenv("TRANSCRIPT_RETENTION", 7 * 24 * 3600))  # Idle sessions are deleted after a week
+DEFAULT_MAX_BYTES = int(os.getenv("TRANSCRIPT_MAX_BYTES", 50 * 1024 * 1024))  # Oldest sessions go first beyond this
+MAINTAIN_EVERY = 200  # Writes between retention / compaction passes
+
+
+class TranscriptStore:
+    """SQLite (WAL) tables of interview sessions and their messages.
+
+    Ended interviews are compacted (messages dropped, summary and counts kept) and
+    deleted with everything else once idle for `retention` seconds. Beyond
+    `max_bytes` of message text the least recently active sessions are removed.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, retention=RETENTION_SECONDS, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.retention = retention
+        self.max_bytes = max_bytes
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")  # Only applies to a new file
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS sessions (
+                id TEXT PRIMARY KEY,
+                config TEXT NOT NULL,
+                summary TEXT NOT NULL DEFAULT '',
+                summary_upto INTEGER NOT NULL DEFAULT 0,
+                message_count INTEGER NOT NULL DEFAULT 0,
+                exchanges INTEGER NOT NULL DEFAULT 0,
+                bytes INTEGER NOT NULL DEFAULT 0,
+                ended INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions(updated_at)")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS messages (
+                session_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                PRIMARY KEY (session_id, seq)
+            ) WITHOUT ROWID"""
+        )
+        self.maintain()
+
+    def create(self, config):
+        """Start a session; returns its id."""
+        session_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sessions (id, config, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                (session_id, json.dumps(config), now, now),
+            )
+        return session_id
+
+    def append(self, session_id, message):
+        """Write one message at the end of the session."""
+        size = len(message["content"])
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT message_count FROM sessions WHERE id = ? AND ended = 0", (session_id,)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "INSERT INTO messages VALUES (?, ?, ?, ?)",
+                        (session_id, row[0], message["role"], message["content"]),
+                    )
+                    self._conn.execute(
+                        "UPDATE sessions SET message_count = message_count + 1, exchanges = exchanges + ?, "
+                        "bytes = bytes + ?, updated_at = ? WHERE id = ?",
+                        (message["role"] == "user", size, time.time(), session_id),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._writes += 1
+            due = self._writes % MAINTAIN_EVERY == 0
+        if due:
+            self.maintain()
+
+    def save_summary(self, session_id, summary, summary_upto):
+        """Persist the rolling summary covering messages[:summary_upto]."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE sessions SET summary = ?, summary_upto = ?, updated_at = ? WHERE id = ?",
+                (summary, summary_upto, time.time(), session_id),
+            )
+
+    def load(self, session_id):
+        """Resume state: config, summary and only the messages after it, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT config, summary, summary_upto, message_count, exchanges FROM sessions "
+                "WHERE id = ? AND ended = 0",
+                (session_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            config, summary, summary_upto, message_count, exchanges = row
+            messages = self._conn.execute(
+                "SELECT role, content FROM messages WHERE session_id = ? AND seq >= ? ORDER BY seq",
+                (session_id, summary_upto),
+            ).fetchall()
+        return {
+            "config": json.loads(config),
+            "summary": summary,
+            "offset": summary_upto,
+            "messages": [{"role": role, "content": content} for role, content in messages],
+            "message_count": message_count,
+            "exchanges": exchanges,
+        }
+
+    def messages(self, session_id, start, end):
+        """Messages with start <= seq < end (older transcript pages)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT role, content FROM messages WHERE session_id = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                (session_id, start, end),
+            ).fetchall()
+        return [{"role": role, "content": content} for role, content in rows]
+
+    def end(self, session_id):
+        """Mark an interview finished; it can no longer be resumed and is compacted."""
+        with self._lock:
+            self._conn.execute("UPDATE sessions SET ended = 1, bytes = 0, updated_at = ? WHERE id = ?",
+                               (time.time(), session_id))
+            self._conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+
+    def maintain(self):
+        """Apply retention and the size budget, then give freed pages back to the OS."""
+        with self._lock:
+            expired = [row[0] for row in self._conn.execute(
+                "SELECT id FROM sessions WHERE updated_at < ?", (time.time() - self.retention,)
+            )]
+            self._delete(expired)
+
+            total = self._conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM sessions").fetchone()[0]
+            oldest = []
+            if total > self.max_bytes:
+                for session_id, size in self._conn.execute("SELECT id, bytes FROM sessions ORDER BY updated_at"):
+                    if total <= self.max_bytes:
+                        break
+                    oldest.append(session_id)
+                    total -= size
+            self._delete(oldest)
+
+            if expired or oldest:
+                self._conn.execute("PRAGMA incremental_vacuum")
+            self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def _delete(self, session_ids):
+        # Caller holds self._lock
+        ids = [(session_id,) for session_id in session_ids]
+        self._conn.executemany("DELETE FROM messages WHERE session_id = ?", ids)
+        self._conn.executemany("DELETE FROM sessions WHERE id = ?", ids)
+
+    def stats(self):
+        with self._lock:
+            sessions, active, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(ended = 0), 0), COALESCE(SUM(bytes), 0) FROM sessions"
+            ).fetchone()
+        return {"sessions": sessions, "active": active, "bytes": size}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Process-wide store, or None when transcripts are disabled or the file can't be opened."""
+    global _store
+    if not ENABLED:
+        return None
+    with _store_lock:
+        if _store is None:
+            try:
+                _store = TranscriptStore()
+            except sqlite3.Error:
+                return None
+        return _store
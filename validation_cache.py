@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Bump this whenever the validation prompt or parsing changes so old verdicts are ignored
+VALIDATOR_VERSION = "2"
+
+DEFAULT_PATH = os.getenv("VALIDATION_CACHE_PATH", os.path.join(".cache", "validation.sqlite3"))
+DEFAULT_TTL_SECONDS = int(os.getenv("VALIDATION_CACHE_TTL", 7 * 24 * 3600))  # 1 week
+DEFAULT_MAX_BYTES = int(os.getenv("VALIDATION_CACHE_MAX_BYTES", 5 * 1024 * 1024))  # 5 MB
+MEMORY_ENTRIES = 512  # Small in-process front so repeat hits skip SQLite entirely
+
+
+def normalize_role(role):
+    """Lowercase and collapse whitespace so 'Software  Engineer ' == 'software engineer'."""
+    return " ".join((role or "").split()).lower()
+
+
+def make_key(role, user_input):
+    """Cache key: normalized role + hash of the (stripped) user input."""
+    input_hash = hashlib.sha256((user_input or "").strip().encode("utf-8")).hexdigest()
+    return f"v{VALIDATOR_VERSION}|{normalize_role(role)}|{input_hash}"
+
+
+class ValidationCache:
+    """SQLite-backed TTL cache for validate_inputs verdicts.
+
+    The database file is shared by every worker process and survives restarts.
+    Entries expire after `ttl` seconds and the least recently used rows are evicted
+    once the stored payloads exceed `max_bytes`.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, ttl=DEFAULT_TTL_SECONDS, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._pending = {"hits": 0, "misses": 0}  # Counter deltas not yet written to SQLite
+        self._touched = {}  # key -> last memory hit not yet written to SQLite
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS verdicts (
+                key TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_verdicts_access ON verdicts(last_access)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+        )
+
+    def get(self, role, user_input):
+        """Return the cached (job_valid, job_reason, input_valid, input_reason) or None."""
+        key = make_key(role, user_input)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] > now:
+                self._memory.move_to_end(key)
+                self._touched[key] = now  # Written on the next flush, so eviction sees the hit
+                self._record(hit=True)
+                return entry[1]
+
+            row = self._conn.execute(
+                "SELECT payload, created_at FROM verdicts WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] + self.ttl <= now:
+                if row is not None:
+                    self._conn.execute("DELETE FROM verdicts WHERE key = ?", (key,))
+                self._memory.pop(key, None)
+                self._record(hit=False)
+                return None
+
+            self._conn.execute("UPDATE verdicts SET last_access = ? WHERE key = ?", (now, key))
+            verdict = tuple(json.loads(row[0]))
+            self._remember(key, row[1] + self.ttl, verdict)
+            self._record(hit=True)
+            return verdict
+
+    def put(self, role, user_input, verdict):
+        """Store a verdict tuple and evict old entries if the cache is over its size budget."""
+        key = make_key(role, user_input)
+        payload = json.dumps(list(verdict))
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO verdicts (key, payload, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(key) + len(payload), now, now),
+            )
+            self._remember(key, now + self.ttl, tuple(verdict))
+            self._flush()
+            self._evict(now)
+
+    def stats(self):
+        """Hit/miss counters for this process plus the totals shared by all processes."""
+        with self._lock:
+            self._flush()
+            shared = dict(self._conn.execute("SELECT name, value FROM counters").fetchall())
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM verdicts"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "total_hits": shared.get("hits", 0),
+            "total_misses": shared.get("misses", 0),
+            "entries": entries,
+            "bytes": size,
+        }
+
+    def clear(self):
+        """Drop every cached verdict (counters are kept)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM verdicts")
+            self._memory.clear()
+            self._touched.clear()
+
+    # --- internal helpers (caller holds self._lock) ---
+
+    def _remember(self, key, expires_at, verdict):
+        self._memory[key] = (expires_at, verdict)
+        self._memory.move_to_end(key)
+        while len(self._memory) > MEMORY_ENTRIES:
+            self._memory.popitem(last=False)
+
+    def _record(self, hit):
+        # Memory hits only bump in-process counters; SQLite is updated on the next flush
+        if hit:
+            self.hits += 1
+            self._pending["hits"] += 1
+        else:
+            self.misses += 1
+            self._pending["misses"] += 1
+
+    def _flush(self):
+        """Write counter deltas and the access times of memory hits to SQLite."""
+        if self._touched:
+            self._conn.executemany("UPDATE verdicts SET last_access = MAX(last_access, ?) WHERE key = ?",
+                                   [(when, key) for key, when in self._touched.items()])
+            self._touched.clear()
+        for name, delta in self._pending.items():
+            if delta:
+                self._conn.execute(
+                    "INSERT INTO counters (name, value) VALUES (?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                    (name, delta),
+                )
+                self._pending[name] = 0
+
+    def _evict(self, now):
+        # Expired rows go first, then least recently used until we fit in max_bytes
+        self._conn.execute("DELETE FROM verdicts WHERE created_at + ? <= ?", (self.ttl, now))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM verdicts").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in self._conn.execute("SELECT key, size FROM verdicts ORDER BY last_access"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM verdicts WHERE key = ?", evicted)
+        for (key,) in evicted:
+            self._memory.pop(key, None)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_validation_cache():
+    """Process-wide cache instance (created on first use)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ValidationCache()
+        return _cache